@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, send_file, Response
 from flask_cors import CORS
+import hmac
+import math
 import os
 import sys
 import traceback
@@ -25,26 +27,86 @@ from dotenv import load_dotenv
 load_dotenv()
 
 API_KEY = os.environ.get('GOOGLE_API_KEY')
+USE_AI_ENGINE = os.environ.get('USE_AI_ENGINE', 'true').lower() in ('1', 'true', 'yes')
+AI_ENGINE = os.environ.get('AI_ENGINE', 'gemini')
 
-if not API_KEY:
+if USE_AI_ENGINE and not API_KEY:
     print("❌ 오류: GOOGLE_API_KEY 환경변수가 설정되지 않았습니다.")
     print("   .env 파일에 GOOGLE_API_KEY=your-key 를 추가하세요.")
+    print("   (AI 없이 캐시/카탈로그만 쓰려면 USE_AI_ENGINE=false)")
     sys.exit(1)
 
 print("\n" + "="*60)
 print("🚀 서버 시작")
 print("="*60)
-print(f"🔑 API 키: {API_KEY[:20]}...")
+if API_KEY:
+    print(f"🔑 API 키: {API_KEY[:20]}...")
 
-# Gemini 로드
-engine = None
+# 엔진 체인 (엔진은 처음 쓸 때 로드)
+chain = None
 try:
-    from gemini_engine import GeminiTravelEngine
-    engine = GeminiTravelEngine(api_key=API_KEY)
+    from engine_registry import EngineRegistry
+    from engine_chain import build_chain_from_env
+    registry = EngineRegistry(api_key=API_KEY)
+    chain = build_chain_from_env(registry, os.path.join(current_dir, 'data'))
 except Exception as e:
-    print(f"❌ Gemini 로드 실패: {e}")
+    print(f"❌ 엔진 체인 구성 실패: {e}")
     traceback.print_exc()
 
+from scoring import rank_destinations
+
+# 상세 캐시 (목록은 요약만, 상세는 /api/destinations/<id>)
+from destination_store import DestinationStore, ResultSetStore
+from response_utils import LIST_FIELDS, parse_fields, project, compress_response
+destination_store = DestinationStore()
+result_sets = ResultSetStore()
+
+# 생성 작업 워커 풀
+from job_queue import JobQueue, QueueFullError
+job_queue = JobQueue(
+    worker_count=int(os.environ.get('JOB_WORKERS', '4')),
+    max_pending=int(os.environ.get('JOB_QUEUE_SIZE', '100'))
+)
+
+# 샘플링 프로파일러 (PROFILE_SAMPLE_RATE=0.001 → 1000번에 1번, 0이면 끔)
+from profiling import SORT_KEYS, RequestProfiler
+profiler = RequestProfiler(
+    output_dir=os.environ.get('PROFILE_DIR', os.path.join(current_dir, 'data', 'profiles')),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+)
+# 관리자 API 토큰 (비어 있거나 예시 값 그대로면 관리자 API 꺼짐)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '').strip()
+if ADMIN_TOKEN in ('change-me', 'your-admin-token-here'):
+    print("⚠️  ADMIN_TOKEN이 예시 값 그대로입니다 - 관리자 API 비활성화")
+    ADMIN_TOKEN = ''
+
+# 지도 클러스터 인덱스 (카탈로그 + 응답한 여행지의 스팟 좌표)
+from geo_index import GridIndex, kakao_level_to_zoom
+geo_index = GridIndex()
+for tier in (chain.tiers if chain else []):
+    if tier.name == 'local_catalog':
+        geo_index.add_destinations(tier.iter_records())
+print(f"🗺️  지도 인덱스: 스팟 {len(geo_index)}개")
+
+# 커버 이미지 프록시 (IMAGE_PROXY=false면 원본 주소 그대로)
+from image_proxy import ImageCache, ImageFetchError
+image_cache = None
+if os.environ.get('IMAGE_PROXY', 'true').lower() in ('1', 'true', 'yes'):
+    image_cache = ImageCache(
+        cache_dir=os.environ.get('IMAGE_CACHE_DIR', os.path.join(current_dir, 'data', 'images')),
+        allowed_hosts=os.environ.get('IMAGE_PROXY_HOSTS', 'loremflickr.com,images.unsplash.com,source.unsplash.com').split(','),
+        max_bytes=int(float(os.environ.get('IMAGE_CACHE_MB', '200')) * 1024 * 1024)
+    )
+
+
+def summarize(dest, fields=LIST_FIELDS):
+    """목록용 요약 (커버 이미지는 프록시 썸네일로)"""
+    summary = project(dest, fields)
+    if image_cache and summary.get('coverImage'):
+        summary['coverImage'] = image_cache.proxy_url(summary['coverImage'], 'thumb')
+    return summary
+
+
 # 프론트엔드
 frontend = os.path.join(os.path.dirname(current_dir), 'frontend')
 print(f"📁 프론트: {frontend}")
@@ -57,7 +119,7 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,POST,OPTIONS')
-    return response
+    return compress_response(response, request.headers.get('Accept-Encoding', ''))
 
 
 @app.route('/')
@@ -88,13 +150,136 @@ def health():
     """상태"""
     return jsonify({
         "status": "healthy",
-        "engine": "Gemini 2.5 Flash Lite + 좌표 검증" if engine else "None"
+        "engine": AI_ENGINE if USE_AI_ENGINE else "None",
+        "chain": [t.name for t in chain.tiers] if chain else []
     })
 
 
+@app.route('/api/engine/chain')
+def engine_chain_stats():
+    """티어별 응답 통계"""
+    if not chain:
+        return jsonify({"error": "엔진 체인 없음"}), 500
+    return jsonify(chain.stats())
+
+
+def run_recommendation(keywords, region, fields=LIST_FIELDS, deadline_ms=None, job=None):
+    """추천 파이프라인 (체인 → 매칭률 → 요약) - 동기 요청과 작업 워커가 공용"""
+    
+    def on_partial(destinations):
+        # 검증 전 파싱 결과를 작업 상태에 미리 노출
+        if job:
+            job.update(stage="validating", partial=[summarize(d, fields) for d in destinations])
+    
+    if job:
+        job.update(stage="generating")
+    
+    # 티어 체인 (캐시 → 카탈로그 → Gemini)
+    count = 5 if region == '전체' else 8
+    destinations, tier = chain.run(
+        keywords=keywords,
+        region=region,
+        count=count,
+        deadline_ms=deadline_ms,
+        on_partial=on_partial
+    )
+    
+    # 매칭률 계산 + 정렬
+    if job:
+        job.update(stage="scoring")
+    rank_destinations(destinations, keywords)
+    geo_index.add_destinations(destinations)
+    
+    print(f"✅ {len(destinations)}개 반환 (tier: {tier})")
+    for i, d in enumerate(destinations[:3], 1):
+        print(f"   {i}. {d.get('city', '?')} - {d.get('matchScore', 0)}%")
+    print()
+    
+    # 전체 레코드는 캐시, 목록은 요약만
+    results = []
+    for dest in destinations[:8]:
+        destination_store.put(dest)
+        results.append(summarize(dest, fields))
+    
+    # 키워드만 바꾼 재요청은 이 묶음을 재정렬 (/rerank)
+    handle = result_sets.put(region, destinations)
+    
+    return {
+        "success": True,
+        "data": results,
+        "count": len(results),
+        "mode": "AI + 좌표검증",
+        "tier": tier,
+        "handle": handle
+    }
+
+
+def rerank_result_set(handle, entry, keywords, fields=LIST_FIELDS):
+    """보관된 묶음을 새 키워드로 다시 채점/정렬 (Gemini 호출 없음)"""
+    
+    # 다른 응답의 상세(matchScore)가 바뀌지 않도록 얕은 복사
+    destinations = rank_destinations([dict(d) for d in entry["destinations"]], keywords)
+    
+    results = []
+    for dest in destinations[:8]:
+        destination_store.put(dest)
+        results.append(summarize(dest, fields))
+    
+    return {
+        "success": True,
+        "data": results,
+        "count": len(results),
+        "mode": "재정렬",
+        "tier": "rerank",
+        "handle": handle
+    }
+
+
+def parse_deadline_ms(value):
+    """요청 전체 마감 (ms) - 없으면 None, 숫자가 아니거나 양수가 아니면 ValueError/TypeError"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("deadline_ms는 숫자여야 합니다")
+    value = float(value)
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError("deadline_ms는 양수여야 합니다")
+    return value
+
+
+def start_recommendation(data, keywords, region, fields, deadline_ms=None):
+    """동기 실행 또는 작업 등록 (async=true / ?mode=job)"""
+    
+    # 작업 모드: 워커 풀에 넘기고 바로 반환
+    if data.get('async') or request.args.get('mode') == 'job':
+        def run_job(job):
+            with profiler.profile("recommend"):
+                return run_recommendation(keywords, region, fields, deadline_ms, job)
+        
+        try:
+            job_id = job_queue.submit(run_job)
+        except QueueFullError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 503
+        
+        print(f"📬 작업 등록: {job_id}")
+        return jsonify({
+            "success": True,
+            "jobId": job_id,
+            "status": "queued",
+            "statusUrl": f"/api/jobs/{job_id}"
+        }), 202
+    
+    with profiler.profile("recommend"):
+        payload = run_recommendation(keywords, region, fields, deadline_ms)
+    return jsonify(payload)
+
+
 @app.route('/api/recommendations', methods=['POST', 'OPTIONS'])
 def recommend():
-    """추천 API"""
+    """추천 API (async=true면 작업 id만 바로 반환)"""
     
     # OPTIONS
     if request.method == 'OPTIONS':
@@ -102,10 +287,10 @@ def recommend():
     
     try:
         # 엔진 체크
-        if not engine:
+        if not chain:
             return jsonify({
                 "success": False,
-                "error": "Gemini 엔진 없음"
+                "error": "엔진 체인 없음"
             }), 500
         
         # 데이터
@@ -119,75 +304,93 @@ def recommend():
         keywords = data.get('keywords', {})
         region = data.get('region', '전체')
         
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        try:
+            deadline_ms = parse_deadline_ms(data.get('deadline_ms'))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "error": "deadline_ms는 양수(ms)여야 합니다"
+            }), 400
+        
         print(f"\n📥 요청: {region}")
         print(f"   키워드: {keywords}")
         
-        # Gemini 호출 (좌표 검증 포함)
-        count = 5 if region == '전체' else 8
-        destinations = engine.generate_destinations(
-            keywords=keywords,
-            selected_region=region,
-            count=count
-        )
-        
-        # 매칭률 계산
-        for dest in destinations:
-            score = 55
-            
-            # 스타일
-            if keywords.get("여행_스타일"):
-                s = dest.get("scores", {}).get("여행_스타일", {}).get(keywords["여행_스타일"], 0)
-                score += s * 0.2
-            
-            # 동행
-            if keywords.get("동행"):
-                s = dest.get("scores", {}).get("동행", {}).get(keywords["동행"], 0)
-                score += s * 0.15
-            
-            # 테마
-            if keywords.get("테마"):
-                scores = []
-                for t in keywords["테마"]:
-                    s = dest.get("scores", {}).get("테마", {}).get(t, 0)
-                    scores.append(s)
-                if scores:
-                    score += (sum(scores) / len(scores)) * 0.4
-            
-            # 페이스
-            if keywords.get("페이스"):
-                s = dest.get("scores", {}).get("페이스", {}).get(keywords["페이스"], 0)
-                score += s * 0.1
-            
-            # 교통
-            if keywords.get("교통"):
-                s = dest.get("scores", {}).get("교통", {}).get(keywords["교통"], 0)
-                score += s * 0.1
-            
-            # 분위기
-            if keywords.get("분위기"):
-                scores = []
-                for v in keywords["분위기"]:
-                    s = dest.get("scores", {}).get("분위기", {}).get(v, 0)
-                    scores.append(s)
-                if scores:
-                    score += (sum(scores) / len(scores)) * 0.05
-            
-            dest['matchScore'] = min(98, max(72, int(score)))
-        
-        # 정렬
-        destinations.sort(key=lambda x: x.get('matchScore', 0), reverse=True)
-        
-        print(f"✅ {len(destinations)}개 반환")
-        for i, d in enumerate(destinations[:3], 1):
-            print(f"   {i}. {d.get('city', '?')} - {d.get('matchScore', 0)}%")
-        print()
+        return start_recommendation(data, keywords, region, fields, deadline_ms)
+    
+    except Exception as e:
+        print(f"❌ 오류: {e}")
+        traceback.print_exc()
         
         return jsonify({
-            "success": True,
-            "data": destinations[:8],
-            "count": len(destinations[:8]),
-            "mode": "AI + 좌표검증"
-        })
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/recommendations/<handle>/rerank', methods=['POST', 'OPTIONS'])
+def rerank(handle):
+    """키워드만 바뀐 재요청 - 기존 결과 묶음 재정렬, 지역이 바뀌면 새로 생성"""
+    
+    # OPTIONS
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                "success": False,
+                "error": "데이터 없음"
+            }), 400
+        
+        entry = result_sets.get(handle)
+        if entry is None:
+            return jsonify({
+                "success": False,
+                "error": "결과 묶음 없음 (만료되었을 수 있음)"
+            }), 404
+        
+        keywords = data.get('keywords', {})
+        region = data.get('region', entry["region"])
+        
+        try:
+            fields = parse_fields(data.get('fields'))
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            }), 400
+        
+        try:
+            deadline_ms = parse_deadline_ms(data.get('deadline_ms'))
+        except (TypeError, ValueError):
+            return jsonify({
+                "success": False,
+                "error": "deadline_ms는 양수(ms)여야 합니다"
+            }), 400
+        
+        print(f"\n🔁 재정렬 요청: {region}")
+        print(f"   키워드: {keywords}")
+        
+        # 지역이 바뀌면 후보 자체가 달라지므로 새로 생성
+        if region != entry["region"]:
+            if not chain:
+                return jsonify({
+                    "success": False,
+                    "error": "엔진 체인 없음"
+                }), 500
+            print(f"   지역 변경 ({entry['region']} → {region}), 새로 생성")
+            return start_recommendation(data, keywords, region, fields, deadline_ms)
+        
+        return jsonify(rerank_result_set(handle, entry, keywords, fields))
     
     except Exception as e:
         print(f"❌ 오류: {e}")
@@ -199,6 +402,201 @@ def recommend():
         }), 500
 
 
+@app.route('/api/stats/generation')
+def generation_stats():
+    """버킷별 토큰 사용량/지연 통계 + 헤지 비율/승률"""
+    if not USE_AI_ENGINE:
+        return jsonify({"error": "AI 엔진 비활성화"}), 404
+    engine = registry.get(AI_ENGINE)
+    return jsonify({
+        **engine.stats.snapshot(),
+        "hedging": engine.hedge.stats()
+    })
+
+
+@app.route('/api/jobs/stats')
+def job_stats():
+    """대기열 깊이 / 워커 사용률"""
+    return jsonify(job_queue.stats())
+
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """작업 상태, 중간 결과, 최종 결과"""
+    
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            "success": False,
+            "error": "작업 없음 (만료되었을 수 있음)"
+        }), 404
+    
+    job["success"] = job["status"] != "failed"
+    return jsonify(job)
+
+
+@app.route('/api/destinations/<dest_id>')
+def destination_detail(dest_id):
+    """여행지 상세 (캐시된 전체 레코드)"""
+    
+    dest = destination_store.get(dest_id)
+    if dest is None:
+        return jsonify({
+            "success": False,
+            "error": "여행지 없음 (만료되었을 수 있음)"
+        }), 404
+    
+    # 저장된 레코드는 그대로 두고 응답에서만 프록시 주소로
+    if image_cache and dest.get('coverImage'):
+        dest = {**dest, 'coverImage': image_cache.proxy_url(dest['coverImage'], 'detail')}
+    
+    response = jsonify({
+        "success": True,
+        "data": dest
+    })
+    # id는 레코드마다 새로 발급(uuid) → 같은 id의 내용은 바뀌지 않음
+    response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+@app.route('/api/images')
+def cover_image():
+    """커버 이미지 프록시 (size=thumb|detail|orig)"""
+    
+    if not image_cache:
+        return jsonify({"success": False, "error": "이미지 프록시 꺼짐"}), 404
+    
+    url = request.args.get('url', '')
+    size = request.args.get('size', 'thumb')
+    
+    try:
+        path, mimetype = image_cache.get(url, size)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except ImageFetchError as e:
+        print(f"⚠️  이미지 프록시 실패: {e}")
+        status = 403 if not image_cache.is_allowed(url) else 502
+        return jsonify({"success": False, "error": str(e)}), status
+    
+    # ETag는 캐시 키(url sha1 + 크기)로 - 내용이 바뀌지 않음
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=os.path.basename(path))
+    # 같은 url+size는 항상 같은 이미지
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@app.route('/api/map/clusters')
+def map_clusters():
+    """뷰포트 마커 클러스터 (swLat, swLng, neLat, neLng + zoom 또는 카카오 level)"""
+    
+    try:
+        sw_lat = float(request.args['swLat'])
+        sw_lng = float(request.args['swLng'])
+        ne_lat = float(request.args['neLat'])
+        ne_lng = float(request.args['neLng'])
+        if 'level' in request.args:
+            zoom = kakao_level_to_zoom(int(request.args['level']))
+        else:
+            zoom = int(request.args.get('zoom', 10))
+        if not all(math.isfinite(v) for v in (sw_lat, sw_lng, ne_lat, ne_lng)):
+            raise ValueError("좌표가 유한한 숫자가 아님")
+    except (KeyError, ValueError):
+        return jsonify({
+            "success": False,
+            "error": "swLat, swLng, neLat, neLng(유한한 숫자)와 zoom(또는 level)이 필요합니다"
+        }), 400
+    
+    if sw_lat > ne_lat or sw_lng > ne_lng:
+        return jsonify({
+            "success": False,
+            "error": "남서(sw) 좌표가 북동(ne) 좌표보다 클 수 없습니다"
+        }), 400
+    
+    response = jsonify({
+        "success": True,
+        **geo_index.clusters(sw_lat, sw_lng, ne_lat, ne_lng, zoom)
+    })
+    # 새 스팟이 계속 추가되므로 짧게만
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def _is_admin():
+    """ADMIN_TOKEN이 설정되어 있고 Authorization: Bearer 토큰이 일치 (상수 시간 비교)"""
+    if not ADMIN_TOKEN:
+        return False
+    supplied = request.headers.get('Authorization', '')
+    return hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {ADMIN_TOKEN}".encode('utf-8'))
+
+
+def parse_sample_rate(value):
+    """프로파일 샘플 비율 - 0~1 사이 숫자가 아니면 ValueError/TypeError"""
+    if isinstance(value, bool):
+        raise ValueError("sampleRate는 숫자여야 합니다")
+    value = float(value)
+    if not math.isfinite(value) or not 0 <= value <= 1:
+        raise ValueError("sampleRate는 0~1 사이여야 합니다")
+    return value
+
+
+@app.route('/api/admin/profiling', methods=['GET', 'POST'])
+def admin_profiling():
+    """프로파일링 상태 조회 / 켜기·끄기 (sampleRate), 덤프 초기화 (reset)"""
+    
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한 없음"}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "error": "JSON 객체가 필요합니다"}), 400
+        if 'sampleRate' in data:
+            try:
+                sample_rate = parse_sample_rate(data['sampleRate'])
+            except (TypeError, ValueError):
+                return jsonify({
+                    "success": False,
+                    "error": "sampleRate는 0~1 사이 숫자여야 합니다"
+                }), 400
+            profiler.set_rate(sample_rate)
+        elif 'enabled' in data:
+            profiler.set_rate(0.001 if data['enabled'] else 0)
+        if data.get('reset'):
+            profiler.reset()
+        print(f"🔬 프로파일링: {profiler.status()}")
+    
+    return jsonify({"success": True, **profiler.status()})
+
+
+@app.route('/api/admin/profiling/download')
+def admin_profiling_download():
+    """샘플된 요청 전체를 합친 pstats (format=text면 상위 함수 표)"""
+    
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한 없음"}), 403
+    
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return jsonify({
+                "success": False,
+                "error": f"sort는 {', '.join(SORT_KEYS)} 중 하나여야 합니다"
+            }), 400
+        text = profiler.aggregate_text(sort=sort)
+        if text is None:
+            return jsonify({"success": False, "error": "프로파일 없음"}), 404
+        return Response(text, mimetype='text/plain')
+    
+    data = profiler.aggregate()
+    if data is None:
+        return jsonify({"success": False, "error": "프로파일 없음"}), 404
+    return Response(
+        data,
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': 'attachment; filename=recommend.prof'}
+    )
+
+
 @app.errorhandler(404)
 def not_found(e):
     return jsonify({"error": "Not Found"}), 404
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+카탈로그 대량 생성 CLI
+지역 × 키워드 프로필 단위로 엔진을 호출하고, 단위마다 체크포인트에 기록
+같은 지역의 단위는 앞에서 모은 도시를 제외하고 생성 (프로필마다 새 도시가 쌓이도록)
+(중간에 실패해도 다시 실행하면 남은 단위만 생성)
+끝나면 좌표 검증 + 중복 제거 후 열 지향 카탈로그 파일로 저장
+
+사용:
+  python build_catalog.py --profiles 6 --workers 4
+  python build_catalog.py --regions 강원,제주 --output data/catalog.bin
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from catalog_store import SCORE_OPTIONS, write_catalog
+from engine_chain import REGION_ALIASES
+from engine_registry import EngineRegistry
+
+
+REGIONS = ["강원", "경기", "충청", "전라", "경상", "부산", "제주"]
+
+
+def build_profiles(n: int) -> List[Dict]:
+    """지역마다 돌릴 키워드 프로필 (테마 조합 위주로 고르게 분산)"""
+
+    themes = list(itertools.combinations(SCORE_OPTIONS["테마"], 2))
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            "여행_스타일": SCORE_OPTIONS["여행_스타일"][i % 3],
+            "동행": SCORE_OPTIONS["동행"][i % 5],
+            "테마": list(themes[(i * 7) % len(themes)]),
+            "페이스": SCORE_OPTIONS["페이스"][i % 3],
+            "교통": SCORE_OPTIONS["교통"][(i // 3) % 3],
+            "분위기": [SCORE_OPTIONS["분위기"][i % 5]],
+        })
+    return profiles
+
+
+def load_checkpoint(path: str) -> Dict[str, List[Dict]]:
+    """완료된 단위 → 결과 (깨진 마지막 줄은 무시)"""
+
+    done = {}
+    if not os.path.exists(path):
+        return done
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            done[entry["unit"]] = entry["destinations"]
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여행지 카탈로그 대량 생성")
+    parser.add_argument("--regions", default=",".join(REGIONS), help="쉼표로 구분한 지역")
+    parser.add_argument("--profiles", type=int, default=6, help="지역당 키워드 프로필 수")
+    parser.add_argument("--count", type=int, default=5, help="호출당 여행지 수")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 생성할 지역 수")
+    parser.add_argument("--engine", default="matching", help="엔진 이름 (engine_registry)")
+    parser.add_argument("--seed", default=os.path.join(current_dir, "data", "destinations.json"),
+                        help="함께 넣을 기존 JSON (없으면 생략)")
+    parser.add_argument("--checkpoint", default=os.path.join(current_dir, "data", "catalog_checkpoint.jsonl"))
+    parser.add_argument("--output", default=os.path.join(current_dir, "data", "catalog.bin"))
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        print("❌ 오류: GOOGLE_API_KEY 환경변수가 설정되지 않았습니다.")
+        sys.exit(1)
+
+    registry = EngineRegistry(api_key=api_key)
+    engine = registry.get(args.engine)
+    validator = registry.get("matching")
+
+    regions = [r.strip() for r in args.regions.split(",") if r.strip()]
+    profiles = build_profiles(args.profiles)
+    units = [(region, i) for region in regions for i in range(len(profiles))]
+
+    seed = []
+    if args.seed and os.path.exists(args.seed):
+        with open(args.seed, encoding="utf-8") as f:
+            seed = json.load(f)
+
+    done = load_checkpoint(args.checkpoint)
+    todo = [u for u in units if f"{u[0]}#{u[1]}" not in done]
+    print(f"📦 단위 {len(units)}개 중 {len(units) - len(todo)}개 완료, {len(todo)}개 생성 예정")
+
+    # 지역별로 이미 모은 도시 (기존 JSON + 완료된 단위) - 새 단위는 이 도시들을 제외하고 생성
+    collected_cities = {region: set() for region in regions}
+    for dest in seed:
+        if isinstance(dest, dict) and dest.get("city"):
+            region = REGION_ALIASES.get(dest.get("region"), dest.get("region"))
+            collected_cities.setdefault(region, set()).add(dest["city"])
+    for key, destinations in done.items():
+        region = key.split("#", 1)[0]
+        collected_cities.setdefault(region, set()).update(d.get("city") for d in destinations if isinstance(d, dict))
+
+    lock = threading.Lock()
+    failed = []
+
+    def run_region(region, checkpoint):
+        """한 지역의 단위는 차례로 (앞 단위 결과를 다음 단위 제외 목록에 반영), 지역끼리는 병렬"""
+
+        for i in range(len(profiles)):
+            key = f"{region}#{i}"
+            if key in done:
+                continue
+
+            with lock:
+                exclude = sorted(c for c in collected_cities[region] if c)
+            try:
+                destinations = engine.generate_destinations(
+                    keywords=profiles[i], selected_region=region, count=args.count, exclude=exclude
+                )
+            except Exception as e:
+                print(f"❌ {key} 실패: {e}")
+                with lock:
+                    failed.append(key)
+                continue
+
+            with lock:
+                checkpoint.write(json.dumps({"unit": key, "destinations": destinations}, ensure_ascii=False) + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                done[key] = destinations
+                collected_cities[region].update(d.get("city") for d in destinations)
+                print(f"💾 {key}: {len(destinations)}개, {region} 누적 도시 {len(collected_cities[region])}개 ({len(done)}/{len(units)})")
+
+    with open(args.checkpoint, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(run_region, region, checkpoint) for region in regions]
+        for future in as_completed(futures):
+            future.result()
+
+    # 기존 JSON + 생성 결과 합치기
+    collected = list(seed)
+    for key, destinations in done.items():
+        region = key.split("#", 1)[0]
+        for dest in destinations:
+            dest["region"] = region
+            collected.append(dest)
+
+    # 좌표 검증 + (지역, 도시) 중복 제거 - 스팟이 많은 쪽 유지
+    records = {}
+    for dest in collected:
+        if not isinstance(dest, dict) or not dest.get("city") or not isinstance(dest.get("scores"), dict):
+            continue
+        region = REGION_ALIASES.get(dest.get("region"), dest.get("region"))
+        dest["region"] = region
+        try:
+            validator._validate_and_fix_coords([dest], region)
+        except Exception:
+            traceback.print_exc()
+            continue
+
+        key = (region, dest["city"])
+        if key not in records or len(dest.get("spots", [])) > len(records[key].get("spots", [])):
+            records[key] = dest
+
+    write_catalog(args.output, list(records.values()))
+    print(f"\n✅ 카탈로그 저장: {args.output} ({len(records)}개)")
+
+    if failed:
+        print(f"⚠️  실패 {len(failed)}개: {', '.join(failed)} - 다시 실행하면 이어서 생성")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
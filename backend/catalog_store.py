@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+열 지향 카탈로그 파일 (memory-map)
+JSON 대신 점수 행렬 + 문자열 테이블로 저장해서
+여러 워커 프로세스가 같은 페이지 캐시를 공유하도록 함
+
+파일 구조 (little-endian, 섹션은 8바이트 정렬)
+  헤더    magic, version, 레코드 수, 점수 키 수, 문자열 수, 섹션 오프셋
+  점수 키  uint32[키 수]            문자열 id ("카테고리/옵션")
+  점수    uint8[레코드 수 * 키 수]    행 = 레코드
+  문자열 열 uint32[열 수 * 레코드 수]  열마다 연속 (city, region, ...)
+  좌표    float32[2 * 레코드 수]      centerLat 열, centerLng 열
+  문자열  uint64[문자열 수 + 1] 오프셋 + UTF-8 본문
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Tuple
+
+
+MAGIC = b"TRCAT\x00\x00\x01"
+VERSION = 1
+
+# 헤더: magic, version, 레코드 수, 키 수, 문자열 수, 섹션 오프셋 6개
+HEADER = struct.Struct("<8sIIII6Q")
+
+# 점수 행렬 키 (프론트 선택지와 동일)
+SCORE_OPTIONS = {
+    "여행_스타일": ["계획형", "즉흥형", "중간형"],
+    "동행": ["솔로", "친구", "커플", "가족", "단체"],
+    "테마": ["맛집", "카페", "로컬", "감성", "액티비티", "휴양", "문화예술", "쇼핑", "자연"],
+    "페이스": ["여유", "적당", "빡빡"],
+    "교통": ["대중교통", "자차", "도보"],
+    "분위기": ["핫플", "한적", "이색", "전통", "트렌디"],
+}
+SCORE_KEYS = [f"{c}/{o}" for c, options in SCORE_OPTIONS.items() for o in options]
+
+# 문자열 열 - detail은 목록에 안 쓰는 나머지 필드(JSON)
+STRING_COLUMNS = ["city", "region", "description", "coverImage", "detail"]
+SUMMARY_FIELDS = ("city", "region", "description", "coverImage", "centerLat", "centerLng", "scores", "id")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_catalog(path: str, records: List[Dict]):
+    """레코드 목록을 열 지향 파일로 저장 (임시 파일 → 교체)"""
+
+    strings = []
+    string_ids = {}
+
+    def intern(text: str) -> int:
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    key_ids = [intern(k) for k in SCORE_KEYS]
+
+    scores = bytearray(len(records) * len(SCORE_KEYS))
+    columns = {name: [] for name in STRING_COLUMNS}
+    lats, lngs = [], []
+
+    for row, dest in enumerate(records):
+        for col, key in enumerate(SCORE_KEYS):
+            category, option = key.split("/", 1)
+            value = dest.get("scores", {}).get(category, {}).get(option, 0)
+            scores[row * len(SCORE_KEYS) + col] = max(0, min(255, int(value)))
+
+        detail = {k: v for k, v in dest.items() if k not in SUMMARY_FIELDS}
+        for name in STRING_COLUMNS:
+            if name == "detail":
+                text = json.dumps(detail, ensure_ascii=False, separators=(",", ":"))
+            else:
+                text = str(dest.get(name) or "")
+            columns[name].append(intern(text))
+
+        lats.append(float(dest.get("centerLat") or 0))
+        lngs.append(float(dest.get("centerLng") or 0))
+
+    blobs = [s.encode("utf-8") for s in strings]
+    string_offsets = [0]
+    for blob in blobs:
+        string_offsets.append(string_offsets[-1] + len(blob))
+
+    n, k = len(records), len(SCORE_KEYS)
+    sections = [
+        struct.pack(f"<{k}I", *key_ids),
+        bytes(scores),
+        struct.pack(f"<{len(STRING_COLUMNS) * n}I", *[i for name in STRING_COLUMNS for i in columns[name]]),
+        struct.pack(f"<{2 * n}f", *lats, *lngs),
+        struct.pack(f"<{len(strings) + 1}Q", *string_offsets),
+        b"".join(blobs),
+    ]
+
+    offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n, k, len(strings), *offsets))
+        for offset, section in zip(offsets, sections):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(section)
+    os.replace(tmp_path, path)
+
+
+class CatalogStore:
+    """열 지향 카탈로그 읽기 (mmap, 필요한 레코드만 디코딩)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = None
+        self._views = []
+        try:
+            self._open()
+        except (ValueError, TypeError, IndexError, struct.error) as e:
+            # 잘린/깨진 파일 → 닫고 ValueError로 (호출 쪽은 JSON으로 대체)
+            self.close()
+            raise ValueError(f"카탈로그 파일 손상: {path} ({e})") from None
+
+        print(f"📚 카탈로그 mmap: {self.size}개, {len(self._mmap) / 1024:.0f}KB ({path})")
+
+    def _open(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f"헤더보다 작음 ({size}바이트)")
+
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n, k, n_strings, *offsets = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("카탈로그 형식이 아님")
+
+        keys_off, scores_off, columns_off, coords_off, str_index_off, str_blob_off = offsets
+
+        # 섹션마다 파일 안에 들어오는지 확인
+        sections = [
+            (keys_off, 4 * k),
+            (scores_off, n * k),
+            (columns_off, 4 * len(STRING_COLUMNS) * n),
+            (coords_off, 8 * n),
+            (str_index_off, 8 * (n_strings + 1)),
+            (str_blob_off, 0),
+        ]
+        for offset, length in sections:
+            if offset < HEADER.size or offset + length > size:
+                raise ValueError(f"섹션 범위 오류 (offset {offset}, {length}바이트)")
+
+        # 문자열 본문 끝이 파일 안에 들어오는지
+        string_end = struct.unpack_from("<Q", self._mmap, str_index_off + 8 * n_strings)[0]
+        if str_blob_off + string_end > size:
+            raise ValueError("문자열 본문 범위 오류")
+
+        def section(start, end, fmt=None):
+            # close()에서 모두 해제할 수 있도록 기록
+            view = memoryview(self._mmap)[start:end]
+            self._views.append(view)
+            if fmt:
+                view = view.cast(fmt)
+                self._views.append(view)
+            return view
+
+        self.size = n
+        self._n_keys = k
+        self._scores = section(scores_off, scores_off + n * k)
+        self._columns = section(columns_off, columns_off + 4 * len(STRING_COLUMNS) * n, "I")
+        self._coords = section(coords_off, coords_off + 8 * n, "f")
+        self._string_offsets = section(str_index_off, str_index_off + 8 * (n_strings + 1), "Q")
+        self._blob = section(str_blob_off, size)
+
+        key_ids = section(keys_off, keys_off + 4 * k, "I")
+        self.score_keys = [self._string(i).split("/", 1) for i in key_ids]
+
+        # 지역 → 레코드 번호 (작은 인덱스라 프로세스마다 만들어도 됨)
+        self._by_region = {}
+        for i in range(n):
+            self._by_region.setdefault(self.column(i, "region"), []).append(i)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _string(self, string_id: int) -> str:
+        start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def column(self, index: int, name: str) -> str:
+        col = STRING_COLUMNS.index(name)
+        return self._string(self._columns[col * self.size + index])
+
+    def regions(self) -> List[str]:
+        return list(self._by_region)
+
+    def indices(self, region: str = None) -> List[int]:
+        """지역의 레코드 번호 (None이면 전체)"""
+        if region is None:
+            return list(range(self.size))
+        return self._by_region.get(region, [])
+
+    def scores(self, index: int) -> Dict[str, Dict[str, int]]:
+        """점수 행렬 한 행 → scores 형태"""
+
+        row = self._scores[index * self._n_keys:(index + 1) * self._n_keys]
+        result = {}
+        for (category, option), value in zip(self.score_keys, row):
+            result.setdefault(category, {})[option] = value
+        return result
+
+    def match_scores(self, plan: List[Tuple[str, List[str], float]]) -> List[int]:
+        """전체 레코드 매칭률 (scoring.match_score_plan 결과로, 점수 행렬 열을 바로 읽음)"""
+
+        columns = {tuple(key): col for col, key in enumerate(self.score_keys)}
+        k = self._n_keys
+
+        totals = [55.0] * self.size
+        for category, options, weight in plan:
+            # 행렬에 없는 선택지는 0점 (평균 분모에는 포함)
+            cols = [self._scores[columns[(category, o)]::k] for o in options if (category, o) in columns]
+            if not cols:
+                continue
+            summed = cols[0] if len(cols) == 1 else map(sum, zip(*cols))
+            n = len(options)
+            totals = [t + (s / n) * weight for t, s in zip(totals, summed)]
+
+        return [min(98, max(72, int(t))) for t in totals]
+
+    def summary(self, index: int) -> Dict:
+        """목록/매칭에 필요한 필드만"""
+
+        return {
+            "city": self.column(index, "city"),
+            "region": self.column(index, "region"),
+            "description": self.column(index, "description"),
+            "coverImage": self.column(index, "coverImage"),
+            "centerLat": round(self._coords[index], 6),
+            "centerLng": round(self._coords[self.size + index], 6),
+            "scores": self.scores(index),
+        }
+
+    def record(self, index: int) -> Dict:
+        """전체 레코드 (detail JSON 포함)"""
+
+        dest = self.summary(index)
+        dest.update(json.loads(self.column(index, "detail")))
+        return dest
+
+    def close(self):
+        # 파생 뷰부터 해제해야 mmap을 닫을 수 있음
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+여행지 상세 캐시
+목록 응답은 요약만 보내고, 전체 레코드는 여기 보관했다가 상세 API로 제공
+결과 묶음(핸들)은 키워드 변경 시 재정렬용으로 보관
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class DestinationStore:
+    """전체 여행지 레코드 LRU 캐시 (id 발급 포함)
+    id는 추측할 수 없는 무작위 값 → 재시작 후에도 다른 레코드와 겹치지 않음
+    """
+
+    def __init__(self, max_size: int = 2000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, dest: Dict) -> str:
+        """레코드 저장 후 전역 id 부여"""
+
+        dest_id = uuid.uuid4().hex
+        with self._lock:
+            dest['id'] = dest_id
+            self._items[dest_id] = dest
+
+            # 오래된 것부터 제거
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+        return dest_id
+
+    def get(self, dest_id: str) -> Optional[Dict]:
+        """id로 전체 레코드 조회"""
+
+        with self._lock:
+            dest = self._items.get(dest_id)
+            if dest is not None:
+                self._items.move_to_end(dest_id)
+            return dest
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class ResultSetStore:
+    """추천 결과 묶음 보관 - 키워드만 바꾼 재요청은 이 묶음을 다시 정렬"""
+
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, region: str, destinations: List[Dict]) -> str:
+        """결과 묶음 저장 후 핸들 반환"""
+
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._items[handle] = {"region": region, "destinations": destinations}
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return handle
+
+    def get(self, handle: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._items.get(handle)
+            if entry is not None:
+                self._items.move_to_end(handle)
+            return entry
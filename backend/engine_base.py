@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gemini 엔진 공통 부분
+호출/재시도/JSON 파싱은 여기서, 프롬프트와 후처리는 각 엔진에서
+"""
+
+import os
+import requests
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List
+
+import profiling
+from generation_stats import GenerationStats
+from hedging import HedgePolicy
+
+
+class BaseTravelEngine:
+    """Gemini REST API 공통 엔진"""
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self.model = "gemini-2.5-flash-lite"
+
+        # 토큰 사용량/지연 통계 → 호출 설정 조정
+        self.stats = GenerationStats(
+            target_latency=float(os.environ.get('GENERATION_TARGET_LATENCY', '20'))
+        )
+
+        # 느린 요청 헤지 (전체 호출 중 최대 HEDGE_MAX_FRACTION 만큼, 진 채 실행 중인 요청은 HEDGE_MAX_OUTSTANDING개까지)
+        self.hedge = HedgePolicy(
+            max_fraction=float(os.environ.get('HEDGE_MAX_FRACTION', '0.1')),
+            max_outstanding=int(os.environ.get('HEDGE_MAX_OUTSTANDING', '2'))
+        )
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gemini")
+
+        print(f"✅ Gemini API 초기화 완료 (model: {self.model})")
+
+    def generate_destinations(self, keywords: Dict, selected_region: str = "전체", count: int = 5,
+                              on_partial: Callable[[List[Dict]], None] = None,
+                              exclude: List[str] = None) -> List[Dict]:
+        """여행지 생성 + 엔진별 후처리 (on_partial: 검증 전 파싱 결과 콜백, exclude: 제외할 도시)
+
+        응답이 모자라면 받은 것은 유지하고 부족한 개수만 추가 요청
+        (이미 받은 배치의 후처리는 추가 요청과 동시에 진행)
+        """
+
+        actual_count = min(max(count, 3), 5)
+        max_retries = 5
+
+        pace = keywords.get("페이스", "적당")
+
+        target = None           # 첫 시도에서 정한 목표 개수
+        received = []           # 검증 전 누적 결과
+        validations = []        # (배치, 후처리 future)
+
+        for attempt in range(max_retries):
+            try:
+                missing = (target - len(received)) if target else actual_count
+
+                # 지난 호출 통계로 개수/출력 토큰 결정 (잘리면 다음 시도에 반영됨)
+                plan = self.stats.plan(selected_region, pace, missing)
+                request_count = plan["count"]
+                if target is None:
+                    target = request_count
+
+                print(f"\n🤖 Gemini 호출 (시도 {attempt + 1}/{max_retries})")
+                print(f"   모델: {self.model}")
+                print(f"   지역: {selected_region}, 개수: {request_count}, maxOutputTokens: {plan['maxOutputTokens']} ({plan['source']})")
+
+                if received or exclude:
+                    cities = list(exclude or []) + [d['city'] for d in received]
+                    print(f"   ➕ {'부족분만 추가 요청' if received else '기존 도시 제외 요청'} (제외 {len(cities)}개)")
+                    prompt = self._build_topup_prompt(selected_region, request_count, keywords, cities)
+                else:
+                    prompt = self._build_prompt(selected_region, request_count, keywords)
+
+                print(f"   📡 요청중...")
+
+                batch = self._request_with_hedge(
+                    prompt, plan["maxOutputTokens"], selected_region, pace, request_count
+                )
+                batch = self._keep_valid(batch, received, exclude)[:target - len(received)]
+
+                if batch:
+                    received.extend(batch)
+                    if on_partial:
+                        on_partial(list(received))
+
+                    # 후처리는 백그라운드에서, 다음 추가 요청과 겹치게
+                    validations.append((batch, self._executor.submit(profiling.wrap(self._postprocess), batch, selected_region)))
+
+                if len(received) >= target:
+                    # 후처리에 실패한 배치는 빼고, 빠진 만큼 다시 요청
+                    if not self._drop_failed(validations, received):
+                        break
+                    continue
+
+                print(f"⚠️  결과 부족 ({len(received)}/{target}개), 부족분 재요청...")
+
+            except requests.exceptions.Timeout:
+                print(f"❌ 시도 {attempt + 1} 타임아웃")
+                if attempt < max_retries - 1:
+                    continue
+            except Exception as e:
+                print(f"❌ 시도 {attempt + 1} 실패: {e}")
+                if attempt < max_retries - 1:
+                    continue
+
+        self._drop_failed(validations, received)
+        destinations = []
+        for _, future in validations:
+            destinations.extend(future.result())
+
+        if len(destinations) >= 2:
+            for i, dest in enumerate(destinations):
+                dest['id'] = i + 1
+
+            print(f"✅ 성공! {len(destinations)}개 생성")
+            for i, d in enumerate(destinations[:3], 1):
+                print(f"   {i}. {self._describe(d)}")
+
+            return destinations
+
+        # 모든 시도 실패
+        print("❌ 모든 시도 실패")
+        raise Exception("여행지 생성 실패. API 키와 모델명을 확인해주세요.")
+
+    def _drop_failed(self, validations: List, received: List[Dict]) -> int:
+        """후처리 완료까지 기다린 뒤 실패한 배치를 제외, 제외한 개수 반환"""
+
+        dropped = 0
+        for entry in list(validations):
+            batch, future = entry
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ 후처리 실패, {len(batch)}개 제외: {e}")
+                validations.remove(entry)
+                ids = {id(d) for d in batch}
+                received[:] = [d for d in received if id(d) not in ids]
+                dropped += len(batch)
+
+        return dropped
+
+    def _keep_valid(self, batch: List[Dict], received: List[Dict], exclude: List[str] = None) -> List[Dict]:
+        """형식이 맞고 아직 안 받은(제외 목록에도 없는) 도시만"""
+
+        if not batch:
+            return []
+
+        seen = {d['city'] for d in received} | set(exclude or [])
+        kept = []
+        for dest in batch:
+            if not isinstance(dest, dict):
+                continue
+            city = dest.get('city')
+            if not city or not isinstance(dest.get('scores'), dict) or city in seen:
+                continue
+            seen.add(city)
+            kept.append(dest)
+
+        return kept
+
+    def _build_topup_prompt(self, region: str, count: int, keywords: Dict, exclude: List[str]) -> str:
+        """부족분 추가 요청용 - 이미 받은 도시 제외"""
+
+        return self._build_prompt(region, count, keywords) + f"""
+
+**추가 요청:**
+- 다음 도시는 이미 추천했으니 제외: {', '.join(exclude)}
+- 위 도시와 겹치지 않는 {count}개만 출력"""
+
+    def _request_with_hedge(self, prompt: str, max_tokens: int, region: str, pace: str, count: int) -> List[Dict]:
+        """첫 요청이 임계값 안에 안 오면 같은 요청을 하나 더 - 먼저 유효하게 파싱된 쪽 사용"""
+
+        self.hedge.start_call()
+        sessions = [requests.Session()]
+        futures = [self._executor.submit(profiling.wrap(self._request_destinations), prompt, max_tokens, region, pace, count, sessions[0])]
+
+        done, _ = wait(futures, timeout=self.hedge.threshold())
+        if not done and self.hedge.try_hedge():
+            print(f"   🪁 {self.hedge.threshold():.1f}초 경과, 헤지 요청 발사")
+            sessions.append(requests.Session())
+            futures.append(self._executor.submit(profiling.wrap(self._request_destinations), prompt, max_tokens, region, pace, count, sessions[1]))
+
+        pending = set(futures)
+        winner, fallback, error = None, None, None
+
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    destinations = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+
+                # 부족분 추가 요청은 1개만 요청하기도 하므로 요청 개수 기준
+                if destinations and len(destinations) >= min(2, count) and winner is None:
+                    winner = futures.index(future)
+                    fallback = destinations
+                elif fallback is None:
+                    fallback = destinations
+
+        # 진 요청 정리 - 시작 전이면 취소, 이미 실행 중이면 requests로는 끊을 수 없어서
+        # 응답이 올 때까지 실행기 스레드/할당량을 쓰므로 끝날 때까지 헤지 상한에 포함
+        for i, future in enumerate(futures):
+            if i == winner or future.cancel() or future.done():
+                sessions[i].close()
+                continue
+            self.hedge.loser_started()
+            future.add_done_callback(lambda f, session=sessions[i]: self._release_loser(session))
+
+        if len(futures) > 1 and winner is not None:
+            self.hedge.record_win(winner == 1)
+            print(f"   🪁 {'헤지' if winner == 1 else '원 요청'} 승리")
+
+        if fallback is None and error is not None:
+            raise error
+        return fallback
+
+    def _release_loser(self, session: requests.Session):
+        session.close()
+        self.hedge.loser_finished()
+
+    def _request_destinations(self, prompt: str, max_tokens: int, region: str, pace: str, count: int,
+                              session: requests.Session) -> List[Dict]:
+        """Gemini 1회 호출 + 파싱 + 사용량 기록"""
+
+        url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
+
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.9,
+                "maxOutputTokens": max_tokens,
+                "topP": 0.95,
+                "topK": 64
+            }
+        }
+
+        headers = {
+            "Content-Type": "application/json"
+        }
+
+        started = time.monotonic()
+        response = session.post(url, json=payload, headers=headers, timeout=60)
+        latency = time.monotonic() - started
+
+        if response.status_code != 200:
+            error_detail = response.json() if response.headers.get('content-type') == 'application/json' else response.text
+            print(f"❌ API 오류 {response.status_code}:")
+            print(f"   {json.dumps(error_detail, indent=2, ensure_ascii=False)[:500]}")
+            raise Exception(f"API 오류: {response.status_code}")
+
+        result = response.json()
+        self.hedge.record_latency(latency)
+
+        # 응답 구조 확인
+        if 'candidates' not in result or len(result['candidates']) == 0:
+            print(f"❌ 응답 형식 오류")
+            raise Exception("응답 형식 오류")
+
+        # 텍스트 추출
+        candidate = result['candidates'][0]
+        text = candidate['content']['parts'][0]['text']
+        truncated = candidate.get('finishReason') == 'MAX_TOKENS'
+        print(f"📨 응답 받음: {len(text)}자 ({latency:.1f}초{', 잘림' if truncated else ''})")
+
+        # JSON 파싱
+        destinations = self._parse_json(text)
+
+        # 토큰 사용량 기록
+        usage = result.get('usageMetadata', {})
+        self.stats.record(
+            region, pace, count,
+            prompt_tokens=usage.get('promptTokenCount', 0),
+            output_tokens=usage.get('candidatesTokenCount', 0),
+            latency=latency,
+            produced=len(destinations) if destinations else 0,
+            truncated=truncated
+        )
+
+        return destinations
+
+    def _build_prompt(self, region: str, count: int, keywords: Dict) -> str:
+        """프롬프트 생성 (엔진별 구현)"""
+        raise NotImplementedError
+
+    def _postprocess(self, destinations: List[Dict], region: str) -> List[Dict]:
+        """파싱 후 후처리 (기본: 그대로)"""
+        return destinations
+
+    def _describe(self, dest: Dict) -> str:
+        """로그용 한 줄 요약"""
+        return dest.get('city', '?')
+
+    def _parse_json(self, text: str) -> List[Dict]:
+        """JSON 파싱"""
+
+        # 방법 1: 직접 파싱
+        try:
+            result = json.loads(text)
+            if isinstance(result, list) and len(result) > 0:
+                print(f"   ✅ JSON 파싱 성공 (직접)")
+                return result
+        except:
+            pass
+
+        # 방법 2: 마크다운 제거
+        try:
+            cleaned = text.strip()
+            if cleaned.startswith("```"):
+                lines = cleaned.split('\n')
+                if lines[0].startswith("```"):
+                    lines = lines[1:]
+                if lines and lines[-1].startswith("```"):
+                    lines = lines[:-1]
+                cleaned = '\n'.join(lines)
+
+            result = json.loads(cleaned.strip())
+            if isinstance(result, list) and len(result) > 0:
+                print(f"   ✅ JSON 파싱 성공 (정리 후)")
+                return result
+        except:
+            pass
+
+        # 방법 3: [ ] 추출
+        try:
+            start = text.find('[')
+            end = text.rfind(']')
+            if start != -1 and end != -1 and end > start:
+                json_str = text[start:end+1]
+                result = json.loads(json_str)
+                if isinstance(result, list) and len(result) > 0:
+                    print(f"   ✅ JSON 파싱 성공 (배열 추출)")
+                    return result
+        except:
+            pass
+
+        print("   ❌ JSON 파싱 실패")
+        print(f"   응답 앞부분: {text[:500]}")
+        return None
+
+    def _format_keywords(self, kw: Dict) -> str:
+        """키워드 문자열"""
+        parts = []
+        if kw.get("여행_스타일"): parts.append(kw["여행_스타일"])
+        if kw.get("동행"): parts.append(kw["동행"])
+        if kw.get("테마"): parts.extend(kw["테마"])
+        if kw.get("페이스"): parts.append(kw["페이스"])
+        if kw.get("교통"): parts.append(kw["교통"])
+        if kw.get("분위기"): parts.extend(kw["분위기"])
+        return ", ".join(parts) if parts else "자유여행"
+
+    def _get_cities(self, region: str) -> str:
+        """지역별 도시"""
+        data = {
+            "강원": "강릉, 속초, 양양, 평창, 정선, 동해",
+            "경기": "가평, 양평, 수원, 파주, 포천, 이천",
+            "충청": "단양, 충주, 천안, 공주, 보령, 태안",
+            "전라": "전주, 순천, 여수, 담양, 보성, 군산",
+            "경상": "경주, 안동, 포항, 울산, 통영, 거제",
+            "부산": "해운대, 광안리, 송도, 기장, 남포동",
+            "제주": "제주시, 서귀포, 애월, 성산, 한림"
+        }
+        return data.get(region, "전국 주요 도시")
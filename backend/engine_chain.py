@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+티어 체인 - 빠른 티어부터 차례로 시도
+정확 캐시 → 유사 프로필 캐시 → 로컬 카탈로그 → Gemini
+각 티어는 자기 지연 예산 안에 답하지 못하면 다음 티어로 넘김
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+import profiling
+from catalog_store import CatalogStore
+from result_cache import ResultCache
+from scoring import compute_match_score, match_score_plan
+
+
+# 카탈로그 지역명 → 선택 화면 지역명
+REGION_ALIASES = {
+    "전남": "전라", "전북": "전라",
+    "경북": "경상", "경남": "경상",
+    "충남": "충청", "충북": "충청",
+}
+
+
+class Tier:
+    """체인의 한 단계"""
+
+    name = "tier"
+
+    # True면 호출 스레드에서 바로 실행 (메모리/mmap 조회처럼 짧은 티어)
+    # 실행기는 Gemini처럼 오래 걸리는 티어만 써서, 밀린 생성 작업이 캐시 조회를 막지 않게 함
+    inline = False
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+
+    def lookup(self, keywords: Dict, region: str, count: int, on_partial=None) -> Optional[List[Dict]]:
+        """결과가 없으면 None (on_partial: 중간 결과 콜백, 지원하는 티어만)"""
+        raise NotImplementedError
+
+    def store(self, keywords: Dict, region: str, count: int, destinations: List[Dict], source: str = None):
+        """뒤쪽 티어가 만든 결과 받기 (캐시 티어만 사용)"""
+        pass
+
+    def stats(self) -> Optional[Dict]:
+        """티어 고유 통계 (있으면)"""
+        return None
+
+    def expected_ms(self) -> float:
+        """보통 걸리는 시간 - 남은 마감이 이보다 짧으면 체인이 건너뜀 (모르면 0)"""
+        return 0.0
+
+
+class ExactCacheTier(Tier):
+    """같은 (지역, 키워드, 개수) 요청의 결과 재사용"""
+
+    name = "exact_cache"
+    inline = True
+
+    def __init__(self, cache: ResultCache, budget_ms: float = 50):
+        super().__init__(budget_ms)
+        self.cache = cache
+
+    def lookup(self, keywords, region, count, on_partial=None):
+        return self.cache.get(region, keywords, count)
+
+    def store(self, keywords, region, count, destinations, source=None):
+        self.cache.put(region, keywords, count, destinations, approximate=(source == SimilarCacheTier.name))
+
+    def stats(self):
+        return self.cache.stats()
+
+
+class SimilarCacheTier(Tier):
+    """정확 일치가 없을 때 비슷한 프로필의 결과를 재사용 (매칭률은 새 키워드로 다시 계산)"""
+
+    name = "similar_cache"
+    inline = True
+
+    # 임계값별 적중률 집계 구간
+    REPORT_THRESHOLDS = [round(0.5 + 0.05 * i, 2) for i in range(10)]
+
+    def __init__(self, cache: ResultCache, threshold: float = 0.8, budget_ms: float = 100):
+        super().__init__(budget_ms)
+        self.cache = cache
+        self.threshold = threshold
+        self._lookups = 0
+        self._at_least = [0] * len(self.REPORT_THRESHOLDS)
+        self._lock = threading.Lock()
+
+    def lookup(self, keywords, region, count, on_partial=None):
+        destinations, similarity = self.cache.find_similar(region, keywords, count)
+
+        # 실제 임계값과 무관하게 "이 임계값이었다면" 적중했을지 집계
+        with self._lock:
+            self._lookups += 1
+            for i, t in enumerate(self.REPORT_THRESHOLDS):
+                if destinations and similarity >= t:
+                    self._at_least[i] += 1
+
+        if destinations and similarity >= self.threshold:
+            print(f"🎯 유사 프로필 적중 (유사도 {similarity:.2f})")
+            return destinations
+        return None
+
+    def store(self, keywords, region, count, destinations, source=None):
+        # exact_cache 없이 구성해도 캐시가 채워지도록 직접 저장 (같은 캐시면 체인이 한 번만 호출)
+        self.cache.put(region, keywords, count, destinations, approximate=(source == SimilarCacheTier.name))
+
+    def stats(self):
+        with self._lock:
+            n = self._lookups
+            return {
+                "threshold": self.threshold,
+                "lookups": n,
+                "hitRateByThreshold": {
+                    str(t): round(hits / n, 3) if n else 0.0
+                    for t, hits in zip(self.REPORT_THRESHOLDS, self._at_least)
+                },
+            }
+
+
+class LocalCatalogTier(Tier):
+    """로컬 카탈로그에서 충분히 잘 맞는 여행지만 골라 응답
+    catalog.bin(build_catalog.py 결과)이 있으면 mmap으로, 없으면 JSON으로
+    """
+
+    name = "local_catalog"
+    inline = True
+
+    def __init__(self, path: str, catalog_path: str = None, budget_ms: float = 200,
+                 min_score: int = 85, min_results: int = 3):
+        super().__init__(budget_ms)
+        self.path = path
+        self.catalog_path = catalog_path
+        self.min_score = min_score
+        self.min_results = min_results
+        self._store = None
+        self._destinations = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """서버 시작 시 미리 로드"""
+
+        with self._lock:
+            if self._store is not None or self._destinations is not None:
+                return
+
+            if self.catalog_path and os.path.exists(self.catalog_path):
+                try:
+                    self._store = CatalogStore(self.catalog_path)
+                    return
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  카탈로그 파일 로드 실패, JSON 사용: {e}")
+
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._destinations = json.load(f)
+                print(f"📚 로컬 카탈로그 {len(self._destinations)}개 로드")
+            except (OSError, ValueError) as e:
+                print(f"⚠️  로컬 카탈로그 로드 실패: {e}")
+                self._destinations = []
+
+    def iter_records(self):
+        """카탈로그 전체 레코드 (지도 인덱스 구축용)"""
+
+        self.load()
+        if self._store is not None:
+            for i in self._store.indices():
+                yield self._store.record(i)
+        else:
+            yield from self._destinations
+
+    def lookup(self, keywords, region, count, on_partial=None):
+        self.load()
+        if self._store is not None:
+            return self._lookup_store(keywords, region, count)
+
+        candidates = []
+        for dest in self._destinations:
+            dest_region = REGION_ALIASES.get(dest.get("region"), dest.get("region"))
+            if region != "전체" and dest_region != region:
+                continue
+            if compute_match_score(dest, keywords) >= self.min_score:
+                candidates.append(dest)
+
+        if len(candidates) < min(self.min_results, count):
+            return None
+
+        candidates.sort(key=lambda d: compute_match_score(d, keywords), reverse=True)
+        return copy.deepcopy(candidates[:count])
+
+    def _lookup_store(self, keywords, region, count):
+        """점수 행렬만 보고 고른 뒤 상위 레코드만 디코딩"""
+
+        store = self._store
+        indices = store.indices() if region == "전체" else [
+            i for r in store.regions() if REGION_ALIASES.get(r, r) == region for i in store.indices(r)
+        ]
+
+        # 선택한 키워드 열만 한 번에 채점 (행마다 scores 딕셔너리를 만들지 않음)
+        scores = store.match_scores(match_score_plan(keywords))
+        scored = [(scores[i], i) for i in indices if scores[i] >= self.min_score]
+
+        if len(scored) < min(self.min_results, count):
+            return None
+
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [store.record(i) for _, i in scored[:count]]
+
+
+class GeminiTier(Tier):
+    """레지스트리의 엔진으로 새로 생성"""
+
+    name = "gemini"
+
+    def __init__(self, registry, engine_name: str, budget_ms: float = 300000):
+        super().__init__(budget_ms)
+        self.registry = registry
+        self.engine_name = engine_name
+
+    @property
+    def engine(self):
+        return self.registry.get(self.engine_name)
+
+    def expected_ms(self) -> float:
+        try:
+            hedge = getattr(self.engine, "hedge", None)
+        except Exception:
+            return 0.0
+        latency = hedge.typical_latency() if hedge is not None else None
+        return latency * 1000 if latency is not None else 0.0
+
+    def lookup(self, keywords, region, count, on_partial=None):
+        return self.engine.generate_destinations(
+            keywords=keywords,
+            selected_region=region,
+            count=count,
+            on_partial=on_partial
+        )
+
+
+class EngineChain:
+    """티어를 순서대로 시도, 처음 성공한 티어가 응답"""
+
+    def __init__(self, tiers: List[Tier], max_workers: int = 16):
+        self.tiers = tiers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tier")
+        self._lock = threading.Lock()
+        self._stats = {
+            tier.name: {"served": 0, "misses": 0, "timeouts": 0, "errors": 0, "skipped": 0, "totalMs": 0.0}
+            for tier in tiers
+        }
+
+    def run(self, keywords: Dict, region: str, count: int, deadline_ms: float = None,
+            on_partial=None) -> Tuple[List[Dict], str]:
+        """(결과, 응답한 티어 이름)"""
+
+        started = time.monotonic()
+
+        for index, tier in enumerate(self.tiers):
+            timeout = tier.budget_ms / 1000
+
+            # 요청 전체 마감이 있으면 남은 시간 안에서만
+            if deadline_ms is not None:
+                remaining = deadline_ms / 1000 - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                # 보통 걸리는 시간보다 남은 시간이 짧으면 시작하지 않음 (어차피 버려질 호출)
+                expected_ms = 0.0 if tier.inline else tier.expected_ms()
+                if remaining * 1000 < expected_ms:
+                    print(f"⏭️  {tier.name}: 남은 {remaining * 1000:.0f}ms < 보통 {expected_ms:.0f}ms, 건너뜀")
+                    self._record(tier.name, "skipped")
+                    continue
+                timeout = min(timeout, remaining)
+
+            tier_started = time.monotonic()
+
+            try:
+                if tier.inline:
+                    result = tier.lookup(keywords, region, count, on_partial)
+                    if (time.monotonic() - tier_started) > timeout:
+                        print(f"🐢 {tier.name}: 예산 {tier.budget_ms:.0f}ms 초과 (결과는 사용)")
+                else:
+                    future = self._executor.submit(profiling.wrap(tier.lookup), keywords, region, count, on_partial)
+                    result = future.result(timeout=timeout)
+            except FutureTimeout:
+                print(f"⏱️  {tier.name}: 예산 {tier.budget_ms:.0f}ms 초과, 다음 티어로")
+                self._record(tier.name, "timeouts")
+                # 늦게 끝난 결과도 앞쪽 캐시에는 채워둠
+                future.add_done_callback(
+                    lambda f, i=index: self._store_late(f, i, keywords, region, count)
+                )
+                continue
+            except Exception as e:
+                print(f"❌ {tier.name} 실패: {e}")
+                self._record(tier.name, "errors")
+                continue
+
+            if not result:
+                self._record(tier.name, "misses")
+                continue
+
+            elapsed_ms = (time.monotonic() - tier_started) * 1000
+            self._record(tier.name, "served", elapsed_ms)
+            print(f"🏁 {tier.name} 응답 ({elapsed_ms:.0f}ms)")
+
+            self._store(index, keywords, region, count, result, tier.name)
+            return result, tier.name
+
+        raise Exception("모든 티어에서 결과를 얻지 못했습니다.")
+
+    def _store(self, index: int, keywords, region, count, destinations, source: str):
+        """응답한 티어 앞쪽(캐시) 티어에 결과 저장 (정확/유사 캐시가 공유하는 저장소는 한 번만)"""
+        stored = set()
+        for tier in self.tiers[:index]:
+            cache = getattr(tier, "cache", None)
+            if cache is not None:
+                if id(cache) in stored:
+                    continue
+                stored.add(id(cache))
+            try:
+                tier.store(keywords, region, count, destinations, source)
+            except Exception as e:
+                print(f"⚠️  {tier.name} 저장 실패: {e}")
+
+    def _store_late(self, future, index, keywords, region, count):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if result:
+            self._store(index, keywords, region, count, result, self.tiers[index].name)
+
+    def _record(self, name: str, field: str, elapsed_ms: float = 0.0):
+        with self._lock:
+            self._stats[name][field] += 1
+            self._stats[name]["totalMs"] += elapsed_ms
+
+    def stats(self) -> Dict:
+        """티어별 응답/미스/타임아웃/건너뜀 집계"""
+
+        with self._lock:
+            result = []
+            for tier in self.tiers:
+                s = self._stats[tier.name]
+                result.append({
+                    "tier": tier.name,
+                    "budgetMs": tier.budget_ms,
+                    "served": s["served"],
+                    "misses": s["misses"],
+                    "timeouts": s["timeouts"],
+                    "errors": s["errors"],
+                    "skipped": s["skipped"],
+                    "avgServeMs": round(s["totalMs"] / s["served"], 1) if s["served"] else None,
+                    "detail": tier.stats(),
+                })
+            return {"tiers": result}
+
+
+def parse_budgets(text: str) -> Dict[str, float]:
+    """'exact_cache=50,gemini=300000' → {이름: ms}"""
+
+    budgets = {}
+    for part in (text or "").split(","):
+        name, _, value = part.partition("=")
+        if name.strip() and value.strip():
+            budgets[name.strip()] = float(value)
+    return budgets
+
+
+def build_chain_from_env(registry, data_dir: str) -> EngineChain:
+    """환경변수(ENGINE_CHAIN, TIER_BUDGETS_MS, AI_ENGINE, USE_AI_ENGINE, SIMILAR_CACHE_THRESHOLD)로 체인 구성"""
+
+    names = [n.strip() for n in os.environ.get("ENGINE_CHAIN", "exact_cache,similar_cache,local_catalog,gemini").split(",") if n.strip()]
+    budgets = parse_budgets(os.environ.get("TIER_BUDGETS_MS", ""))
+    use_ai = os.environ.get("USE_AI_ENGINE", "true").lower() in ("1", "true", "yes")
+    engine_name = os.environ.get("AI_ENGINE", "gemini")
+    threshold = float(os.environ.get("SIMILAR_CACHE_THRESHOLD", "0.8"))
+
+    # 정확/유사 캐시는 같은 저장소 공유
+    cache = ResultCache()
+
+    tiers = []
+    for name in names:
+        if name == "exact_cache":
+            tier = ExactCacheTier(cache)
+        elif name == "similar_cache":
+            tier = SimilarCacheTier(cache, threshold)
+        elif name == "local_catalog":
+            tier = LocalCatalogTier(
+                os.path.join(data_dir, "destinations.json"),
+                catalog_path=os.environ.get("CATALOG_PATH", os.path.join(data_dir, "catalog.bin"))
+            )
+            tier.load()
+        elif name == "gemini":
+            if not use_ai:
+                print("ℹ️  USE_AI_ENGINE=false → Gemini 티어 제외")
+                continue
+            tier = GeminiTier(registry, engine_name)
+        else:
+            print(f"⚠️  알 수 없는 티어 무시: {name}")
+            continue
+
+        if name in budgets:
+            tier.budget_ms = budgets[name]
+        tiers.append(tier)
+
+    print(f"🔗 엔진 체인: {' → '.join(f'{t.name}({t.budget_ms:.0f}ms)' for t in tiers)}")
+    return EngineChain(tiers)
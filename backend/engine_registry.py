@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+엔진 레지스트리 - 이름으로 엔진 선택, 처음 쓸 때 import
+"""
+
+import importlib
+import threading
+from typing import Dict, Tuple
+
+
+# 이름 → (모듈, 클래스)
+ENGINE_SPECS: Dict[str, Tuple[str, str]] = {
+    "gemini": ("gemini_engine", "GeminiTravelEngine"),      # 식당 강화, 좌표 없음
+    "matching": ("matching_engine", "GeminiTravelEngine"),  # 좌표 검증
+}
+
+
+class EngineRegistry:
+    """엔진 지연 로딩 + 인스턴스 재사용"""
+
+    def __init__(self, api_key: str, specs: Dict[str, Tuple[str, str]] = None):
+        self.api_key = api_key
+        self.specs = dict(specs or ENGINE_SPECS)
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, module: str, class_name: str):
+        """엔진 추가 등록"""
+        with self._lock:
+            self.specs[name] = (module, class_name)
+            self._instances.pop(name, None)
+
+    def names(self):
+        return list(self.specs)
+
+    def get(self, name: str):
+        """엔진 인스턴스 (없으면 이때 import/생성)"""
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+
+            if name not in self.specs:
+                raise KeyError(f"알 수 없는 엔진: {name} (사용 가능: {', '.join(self.specs)})")
+
+            module_name, class_name = self.specs[name]
+            print(f"🔌 엔진 로드: {name} ({module_name}.{class_name})")
+
+            module = importlib.import_module(module_name)
+            engine = getattr(module, class_name)(api_key=self.api_key)
+
+            self._instances[name] = engine
+            return engine
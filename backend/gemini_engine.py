@@ -6,150 +6,13 @@ Gemini API - 지도 없는 버전 (좌표 불필요)
 식당 추천 강화
 """
 
-import requests
-import json
-from typing import Dict, List
+from typing import Dict
 
-class GeminiTravelEngine:
+from engine_base import BaseTravelEngine
+
+class GeminiTravelEngine(BaseTravelEngine):
     """Gemini REST API - 식당 상세 추천"""
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
-        self.model = "gemini-2.5-flash-lite"
-        
-        print(f"✅ Gemini API 초기화 완료 (model: {self.model})")
-    
-    def generate_destinations(self, keywords: Dict, selected_region: str = "전체", count: int = 5) -> List[Dict]:
-        """여행지 생성 - 식당 정보 강화"""
-        
-        actual_count = min(max(count, 3), 5)
-        max_retries = 5
-        
-        for attempt in range(max_retries):
-            try:
-                print(f"\n🤖 Gemini 호출 (시도 {attempt + 1}/{max_retries})")
-                print(f"   모델: {self.model}")
-                print(f"   지역: {selected_region}, 개수: {actual_count}")
-                
-                prompt = self._build_prompt(selected_region, actual_count, keywords)
-                
-                url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
-                
-                payload = {
-                    "contents": [{
-                        "parts": [{
-                            "text": prompt
-                        }]
-                    }],
-                    "generationConfig": {
-                        "temperature": 0.9,
-                        "maxOutputTokens": 16384,
-                        "topP": 0.95,
-                        "topK": 64
-                    }
-                }
-                
-                headers = {
-                    "Content-Type": "application/json"
-                }
-                
-                print(f"   📡 요청중...")
-                
-                response = requests.post(url, json=payload, headers=headers, timeout=60)
-                
-                if response.status_code != 200:
-                    error_detail = response.json() if response.headers.get('content-type') == 'application/json' else response.text
-                    print(f"❌ API 오류 {response.status_code}")
-                    
-                    if attempt < max_retries - 1:
-                        continue
-                    raise Exception(f"API 오류: {response.status_code}")
-                
-                result = response.json()
-                
-                if 'candidates' not in result or len(result['candidates']) == 0:
-                    print(f"❌ 응답 형식 오류")
-                    if attempt < max_retries - 1:
-                        continue
-                    raise Exception("응답 형식 오류")
-                
-                text = result['candidates'][0]['content']['parts'][0]['text']
-                print(f"📨 응답 받음: {len(text)}자")
-                
-                destinations = self._parse_json(text)
-                
-                if destinations and len(destinations) >= 2:
-                    for i, dest in enumerate(destinations):
-                        dest['id'] = i + 1
-                    
-                    print(f"✅ 성공! {len(destinations)}개 생성")
-                    for i, d in enumerate(destinations[:3], 1):
-                        city = d.get('city', '?')
-                        print(f"   {i}. {city}")
-                    
-                    return destinations
-                else:
-                    print(f"⚠️  결과 부족 ({len(destinations) if destinations else 0}개), 재시도...")
-                    
-            except requests.exceptions.Timeout:
-                print(f"❌ 시도 {attempt + 1} 타임아웃")
-                if attempt < max_retries - 1:
-                    continue
-            except Exception as e:
-                print(f"❌ 시도 {attempt + 1} 실패: {e}")
-                if attempt < max_retries - 1:
-                    continue
-        
-        print("❌ 모든 시도 실패")
-        raise Exception("여행지 생성 실패. API 키와 모델명을 확인해주세요.")
-    
-    def _parse_json(self, text: str) -> List[Dict]:
-        """JSON 파싱"""
-        
-        # 직접 파싱
-        try:
-            result = json.loads(text)
-            if isinstance(result, list) and len(result) > 0:
-                print(f"   ✅ JSON 파싱 성공 (직접)")
-                return result
-        except:
-            pass
-        
-        # 마크다운 제거
-        try:
-            cleaned = text.strip()
-            if cleaned.startswith("```"):
-                lines = cleaned.split('\n')
-                if lines[0].startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].startswith("```"):
-                    lines = lines[:-1]
-                cleaned = '\n'.join(lines)
-            
-            result = json.loads(cleaned.strip())
-            if isinstance(result, list) and len(result) > 0:
-                print(f"   ✅ JSON 파싱 성공 (정리 후)")
-                return result
-        except:
-            pass
-        
-        # [ ] 추출
-        try:
-            start = text.find('[')
-            end = text.rfind(']')
-            if start != -1 and end != -1 and end > start:
-                json_str = text[start:end+1]
-                result = json.loads(json_str)
-                if isinstance(result, list) and len(result) > 0:
-                    print(f"   ✅ JSON 파싱 성공 (배열 추출)")
-                    return result
-        except:
-            pass
-        
-        print("   ❌ JSON 파싱 실패")
-        return None
-    
     def _build_prompt(self, region: str, count: int, keywords: Dict) -> str:
         """프롬프트 생성 - 식당 정보 강화, 좌표 제거"""
         
@@ -169,7 +32,7 @@ class GeminiTravelEngine:
         return f"""당신은 한국 여행 전문가입니다. 아래 조건에 맞는 여행지를 JSON 배열로만 출력하세요.
 
 **조건:**
-- 지역: {region} (도시: {cities})
+- 지역: {region} (대표 도시 예: {cities} - 이 외에도 {region} 안의 시·군·읍·면 어디든 가능)
 - 개수: {count}개
 - 사용자 선호: {kw}
 - 페이스: {pace} → 각 여행지당 {min_spots}-{max_spots}개 스팟
@@ -289,27 +152,3 @@ class GeminiTravelEngine:
 - restaurants 배열에 상세 식당 정보 추가
 
 순수 JSON 배열만 출력!"""
-    
-    def _format_keywords(self, kw: Dict) -> str:
-        """키워드 문자열"""
-        parts = []
-        if kw.get("여행_스타일"): parts.append(kw["여행_스타일"])
-        if kw.get("동행"): parts.append(kw["동행"])
-        if kw.get("테마"): parts.extend(kw["테마"])
-        if kw.get("페이스"): parts.append(kw["페이스"])
-        if kw.get("교통"): parts.append(kw["교통"])
-        if kw.get("분위기"): parts.extend(kw["분위기"])
-        return ", ".join(parts) if parts else "자유여행"
-    
-    def _get_cities(self, region: str) -> str:
-        """지역별 도시"""
-        data = {
-            "강원": "강릉, 속초, 양양, 평창, 정선, 동해",
-            "경기": "가평, 양평, 수원, 파주, 포천, 이천",
-            "충청": "단양, 충주, 천안, 공주, 보령, 태안",
-            "전라": "전주, 순천, 여수, 담양, 보성, 군산",
-            "경상": "경주, 안동, 포항, 울산, 통영, 거제",
-            "부산": "해운대, 광안리, 송도, 기장, 남포동",
-            "제주": "제주시, 서귀포, 애월, 성산, 한림"
-        }
-        return data.get(region, "전국 주요 도시")
\ No newline at end of file
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+생성 통계 - (지역, 페이스, 개수) 버킷별 토큰 사용량/지연 기록
+기록된 값으로 maxOutputTokens와 요청 개수를 정함
+"""
+
+import math
+import threading
+from typing import Dict, Tuple
+
+
+# 통계가 없을 때 쓰는 기본값 (기존 고정 설정)
+DEFAULT_MAX_OUTPUT_TOKENS = 16384
+MIN_OUTPUT_TOKENS = 2048
+MIN_SAMPLES = 3
+EWMA_ALPHA = 0.3
+
+
+class _Bucket:
+    """버킷 하나의 누적/이동평균 값"""
+
+    def __init__(self):
+        self.samples = 0
+        self.truncations = 0
+        self.prompt_tokens = 0.0        # 이동평균
+        self.output_tokens = 0.0
+        self.tokens_per_dest = 0.0
+        self.seconds_per_token = 0.0
+        self.latency = 0.0
+        self.max_latency = 0.0
+
+    def add(self, prompt_tokens, output_tokens, latency, produced, truncated):
+        def ewma(old, new):
+            return new if self.samples == 0 else old + EWMA_ALPHA * (new - old)
+
+        self.prompt_tokens = ewma(self.prompt_tokens, prompt_tokens)
+        self.output_tokens = ewma(self.output_tokens, output_tokens)
+        self.latency = ewma(self.latency, latency)
+        if produced and not truncated:
+            self.tokens_per_dest = ewma(self.tokens_per_dest, output_tokens / produced)
+        if output_tokens:
+            self.seconds_per_token = ewma(self.seconds_per_token, latency / output_tokens)
+
+        self.max_latency = max(self.max_latency, latency)
+        self.samples += 1
+        if truncated:
+            self.truncations += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "samples": self.samples,
+            "truncations": self.truncations,
+            "avgPromptTokens": round(self.prompt_tokens),
+            "avgOutputTokens": round(self.output_tokens),
+            "tokensPerDestination": round(self.tokens_per_dest),
+            "msPerOutputToken": round(self.seconds_per_token * 1000, 2),
+            "avgLatencyMs": round(self.latency * 1000),
+            "maxLatencyMs": round(self.max_latency * 1000),
+        }
+
+
+class GenerationStats:
+    """버킷별 통계 + 다음 호출 설정 계산"""
+
+    def __init__(self, target_latency: float = 20.0, headroom: float = 1.4, min_count: int = 3):
+        self.target_latency = target_latency
+        self.headroom = headroom
+        self.min_count = min_count
+        self._buckets: Dict[Tuple[str, str, int], _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def record(self, region: str, pace: str, count: int, prompt_tokens: int, output_tokens: int,
+               latency: float, produced: int, truncated: bool = False):
+        """Gemini 호출 1회 결과 기록 (usageMetadata 기반)"""
+
+        with self._lock:
+            bucket = self._buckets.setdefault((region, pace, count), _Bucket())
+            bucket.add(prompt_tokens, output_tokens, latency, produced, truncated)
+
+    def _estimate(self, region: str, pace: str, count: int) -> Tuple[float, float, float]:
+        """(여행지당 토큰, 토큰당 초, 잘림 비율) - 버킷 → 같은 페이스 → 전체 순으로"""
+
+        candidates = [
+            [self._buckets.get((region, pace, count))],
+            [b for (r, p, c), b in self._buckets.items() if p == pace],
+            list(self._buckets.values()),
+        ]
+
+        for group in candidates:
+            group = [b for b in group if b is not None and b.tokens_per_dest > 0]
+            samples = sum(b.samples for b in group)
+            if samples >= MIN_SAMPLES:
+                tokens_per_dest = sum(b.tokens_per_dest * b.samples for b in group) / samples
+                seconds_per_token = sum(b.seconds_per_token * b.samples for b in group) / samples
+                truncation_rate = sum(b.truncations for b in group) / samples
+                return tokens_per_dest, seconds_per_token, truncation_rate
+
+        return 0.0, 0.0, 0.0
+
+    def plan(self, region: str, pace: str, count: int) -> Dict:
+        """목표 지연 안에 잘리지 않고 끝나도록 개수/maxOutputTokens 결정"""
+
+        with self._lock:
+            tokens_per_dest, seconds_per_token, truncation_rate = self._estimate(region, pace, count)
+
+        if not tokens_per_dest:
+            return {"count": count, "maxOutputTokens": DEFAULT_MAX_OUTPUT_TOKENS, "source": "default"}
+
+        # 목표 지연 안에 들어오는 최대 개수
+        planned_count = count
+        if seconds_per_token > 0:
+            fit = int(self.target_latency / (tokens_per_dest * seconds_per_token))
+            planned_count = max(min(self.min_count, count), min(count, fit))
+
+        # 잘림이 잦았던 버킷은 여유를 더 둠
+        headroom = self.headroom * (1 + truncation_rate)
+        max_tokens = math.ceil(tokens_per_dest * planned_count * headroom)
+        max_tokens = max(MIN_OUTPUT_TOKENS, min(DEFAULT_MAX_OUTPUT_TOKENS, max_tokens))
+
+        return {
+            "count": planned_count,
+            "maxOutputTokens": max_tokens,
+            "source": "stats",
+            "expectedLatencyMs": round(tokens_per_dest * planned_count * seconds_per_token * 1000),
+        }
+
+    def snapshot(self) -> Dict:
+        """버킷별 통계 (조회용)"""
+
+        with self._lock:
+            return {
+                "targetLatencyMs": round(self.target_latency * 1000),
+                "buckets": [
+                    {"region": r, "pace": p, "count": c, **b.to_dict()}
+                    for (r, p, c), b in sorted(self._buckets.items())
+                ],
+            }
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+지도 마커 클러스터링 - 스팟 좌표 격자 인덱스
+줌 레벨마다 격자 칸별 집계(개수, 평균 좌표)를 미리 만들어 두고
+뷰포트에 걸친 칸만 돌려줌 → 화면 안 스팟 수와 무관하게 응답 크기 일정
+"""
+
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+
+# 대한민국 좌표 범위 (matching_engine REGION_COORDS["전체"]와 동일)
+KOREA_LAT = (33.0, 38.6)
+KOREA_LNG = (126.0, 130.0)
+
+MIN_ZOOM = 5
+MAX_ZOOM = 18
+CELLS_PER_TILE = 4      # 256px 타일 한 장을 4x4 칸으로 → 칸 하나 약 64px
+MAX_CELLS = 400         # 응답 칸 수 상한 (넘으면 한 단계 축소)
+
+
+def cell_size(zoom: int) -> float:
+    """줌 레벨의 격자 칸 크기 (도)"""
+    return 360.0 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def kakao_level_to_zoom(level: int) -> int:
+    """카카오맵 level(1=가장 확대) → 웹 지도 zoom"""
+    return 20 - level
+
+
+class GridIndex:
+    """줌 레벨별 격자 집계"""
+
+    def __init__(self):
+        # zoom → {(ix, iy): [개수, 위도 합, 경도 합, 대표 스팟]}
+        self._levels: Dict[int, Dict[Tuple[int, int], list]] = {z: {} for z in range(MIN_ZOOM, MAX_ZOOM + 1)}
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def add_destinations(self, destinations: Iterable[Dict]) -> int:
+        """여행지들의 스팟 추가 (좌표 없는/보정으로 만든/범위 밖/이미 있는 스팟은 제외), 추가 개수 반환"""
+
+        added = 0
+        with self._lock:
+            for dest in destinations:
+                for spot in dest.get("spots") or []:
+                    # 좌표 검증에서 도시 중심 주변 임의 좌표로 채운 스팟
+                    if spot.get("approx"):
+                        continue
+                    lat, lng = spot.get("lat"), spot.get("lng")
+                    if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+                        continue
+                    if not (KOREA_LAT[0] <= lat <= KOREA_LAT[1] and KOREA_LNG[0] <= lng <= KOREA_LNG[1]):
+                        continue
+
+                    key = (dest.get("city"), spot.get("name"))
+                    if key in self._seen:
+                        continue
+                    self._seen.add(key)
+
+                    sample = {
+                        "name": spot.get("name"),
+                        "category": spot.get("category"),
+                        "city": dest.get("city"),
+                        "lat": lat,
+                        "lng": lng,
+                    }
+                    for zoom, cells in self._levels.items():
+                        size = cell_size(zoom)
+                        cell = cells.setdefault((int(lng // size), int(lat // size)), [0, 0.0, 0.0, sample])
+                        cell[0] += 1
+                        cell[1] += lat
+                        cell[2] += lng
+                    added += 1
+
+        return added
+
+    def clusters(self, sw_lat: float, sw_lng: float, ne_lat: float, ne_lng: float, zoom: int) -> Dict:
+        """뷰포트 안 클러스터 (칸 수가 MAX_CELLS를 넘으면 줌을 낮춰 맞춤)"""
+
+        zoom = max(MIN_ZOOM, min(MAX_ZOOM, int(zoom)))
+
+        while True:
+            size = cell_size(zoom)
+            x0, x1 = int(sw_lng // size), int(ne_lng // size)
+            y0, y1 = int(sw_lat // size), int(ne_lat // size)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) <= MAX_CELLS or zoom == MIN_ZOOM:
+                break
+            zoom -= 1
+
+        result: List[Dict] = []
+        total = 0
+
+        with self._lock:
+            cells = self._levels[zoom]
+            view_cells = (x1 - x0 + 1) * (y1 - y0 + 1)
+
+            # 뷰포트 칸 순회와 채워진 칸 순회 중 적은 쪽
+            if view_cells <= len(cells):
+                keys = ((x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+                items = ((k, cells[k]) for k in keys if k in cells)
+            else:
+                items = ((k, c) for k, c in cells.items() if x0 <= k[0] <= x1 and y0 <= k[1] <= y1)
+
+            for (x, y), (count, lat_sum, lng_sum, sample) in items:
+                total += count
+                if count == 1:
+                    result.append({"count": 1, **sample})
+                else:
+                    result.append({
+                        "count": count,
+                        "lat": round(lat_sum / count, 6),
+                        "lng": round(lng_sum / count, 6),
+                        "bounds": [y * size, x * size, (y + 1) * size, (x + 1) * size],
+                    })
+
+        return {
+            "zoom": zoom,
+            "cellSize": size,
+            "total": total,
+            "clusters": result,
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+헤지 요청 정책
+첫 요청이 최근 p90 지연을 넘기면 같은 요청을 하나 더 보냄
+전체 호출 중 헤지 비율은 상한 이하로 유지 (할당량 보호)
+진 요청은 끊을 수 없어 응답이 올 때까지 돌기 때문에, 그런 요청 수도 상한으로 제한
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class HedgePolicy:
+    """적응형 헤지 임계값 + 헤지 비율 상한 + 통계"""
+
+    def __init__(self, percentile: float = 0.9, max_fraction: float = 0.1,
+                 default_threshold: float = 20.0, min_samples: int = 10, window: int = 200,
+                 max_outstanding: int = 2):
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.max_outstanding = max_outstanding
+        self.default_threshold = default_threshold
+        self.min_samples = min_samples
+
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.outstanding = 0    # 지고 나서도 아직 실행 중인 요청
+
+    def record_latency(self, latency: float):
+        """응답이 온 요청의 지연 기록"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _latency_at(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile))
+        return ordered[index]
+
+    def threshold(self) -> float:
+        """헤지 발사 시점 (초) - 최근 지연의 p90, 샘플이 적으면 기본값"""
+
+        latency = self._latency_at(self.percentile)
+        return self.default_threshold if latency is None else latency
+
+    def typical_latency(self) -> Optional[float]:
+        """보통 걸리는 시간 (초) - 최근 지연의 중앙값, 샘플이 적으면 None"""
+        return self._latency_at(0.5)
+
+    def start_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_hedge(self) -> bool:
+        """상한 안이면 헤지 1회 예약"""
+
+        with self._lock:
+            if self.hedged + 1 > self.max_fraction * self.calls:
+                return False
+            if self.outstanding >= self.max_outstanding:
+                return False
+            self.hedged += 1
+            return True
+
+    def record_win(self, hedge_won: bool):
+        if hedge_won:
+            with self._lock:
+                self.hedge_wins += 1
+
+    def loser_started(self):
+        """진 요청이 끝나지 않은 채 남음"""
+        with self._lock:
+            self.outstanding += 1
+
+    def loser_finished(self):
+        with self._lock:
+            self.outstanding -= 1
+
+    def stats(self) -> Dict:
+        threshold: Optional[float] = self.threshold()
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedgeRate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                "hedgeWins": self.hedge_wins,
+                "winRate": round(self.hedge_wins / self.hedged, 3) if self.hedged else 0.0,
+                "maxHedgeFraction": self.max_fraction,
+                "outstandingLosers": self.outstanding,
+                "maxOutstanding": self.max_outstanding,
+                "thresholdMs": round(threshold * 1000),
+                "latencySamples": len(self._latencies),
+            }
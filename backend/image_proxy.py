@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+커버 이미지 프록시 - 원본은 한 번만 받아 디스크에 캐시
+썸네일/상세 크기로 미리 줄여 두고 (Pillow 없으면 원본 그대로)
+용량을 넘으면 오래 안 쓴 파일부터 삭제 (LRU)
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, urljoin, urlparse
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# 크기별 최대 가로x세로 (비율 유지, 확대 안 함)
+VARIANTS = {
+    "thumb": (480, 360),    # 결과 카드 (높이 220px)
+    "detail": (1024, 768),  # 상세 모달 (높이 300px)
+}
+
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+MAX_REDIRECTS = 5
+JPEG_QUALITY = 82
+
+
+class ImageFetchError(Exception):
+    """원본을 받아오지 못함 (허용 안 된 호스트, 네트워크, 이미지 아님)"""
+
+
+def _sniff_mimetype(data: bytes) -> str:
+    """매직 바이트로 이미지 형식 판별"""
+
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class ImageCache:
+    """원본/크기별 이미지 디스크 캐시 (용량 상한 + LRU)"""
+
+    def __init__(self, cache_dir: str, allowed_hosts: Iterable[str],
+                 max_bytes: int = 200 * 1024 * 1024, timeout: float = 10):
+        self.cache_dir = cache_dir
+        self.allowed_hosts = {h.strip().lower() for h in allowed_hosts if h.strip()}
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+
+        self._files = OrderedDict()    # 파일명 → 크기 (앞쪽이 오래 안 쓴 것)
+        self._total = 0
+        self._lock = threading.Lock()
+        self._fetching = {}            # 키 → Lock (같은 원본 동시 요청은 한 번만 받기)
+        self._stats = {"hits": 0, "fetches": 0, "evictions": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # 재시작해도 캐시 유지 - 사용 순서는 메모리에만 있으므로 생성 시각 순으로 복원
+        entries = []
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._total += size
+
+        print(f"🖼️  이미지 캐시: {len(self._files)}개, {self._total / 1024 / 1024:.1f}MB ({cache_dir})"
+              + ("" if Image else " - Pillow 없음, 원본 크기로 제공"))
+
+    def is_allowed(self, url: str) -> bool:
+        parsed = urlparse(url or "")
+        return parsed.scheme in ("http", "https") and (parsed.hostname or "").lower() in self.allowed_hosts
+
+    def proxy_url(self, url: str, size: str) -> str:
+        """응답에 넣을 프록시 주소 (허용 안 된 주소는 그대로)"""
+        if not self.is_allowed(url):
+            return url
+        return f"/api/images?size={size}&url={quote(url, safe='')}"
+
+    def get(self, url: str, size: str) -> Tuple[str, str]:
+        """크기별 캐시 파일 경로와 mimetype (없으면 받아서 생성)"""
+
+        if size not in VARIANTS and size != "orig":
+            raise ValueError(f"알 수 없는 크기: {size}")
+        if not self.is_allowed(url):
+            raise ImageFetchError("허용되지 않은 이미지 호스트")
+
+        # 축소할 수 없으면 같은 내용을 크기별로 또 저장하지 않음
+        if Image is None:
+            size = "orig"
+
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+        path = self._touch(f"{key}.{size}")
+        if path:
+            with self._lock:
+                self._stats["hits"] += 1
+            return path, _sniff_mimetype(self._head(path))
+
+        with self._lock:
+            fetch_lock = self._fetching.setdefault(key, threading.Lock())
+
+        try:
+            with fetch_lock:
+                # 기다리는 동안 다른 요청이 만들었을 수 있음
+                path = self._touch(f"{key}.{size}")
+                if path is None:
+                    original = self._read(f"{key}.orig")
+                    if original is None:
+                        original = self._fetch(url)
+                        path = self._write(f"{key}.orig", original)
+                    if size != "orig":
+                        path = self._write(f"{key}.{size}", self._resize(original, VARIANTS[size]))
+        finally:
+            with self._lock:
+                self._fetching.pop(key, None)
+
+        return path, _sniff_mimetype(self._head(path))
+
+    def _fetch(self, url: str) -> bytes:
+        with self._lock:
+            self._stats["fetches"] += 1
+
+        try:
+            # 리다이렉트는 직접 따라가며 매 단계 호스트 확인 (허용 호스트를 거쳐 내부 주소로 가는 것 차단)
+            for _ in range(MAX_REDIRECTS + 1):
+                response = requests.get(url, timeout=self.timeout, stream=True, allow_redirects=False)
+                if not response.is_redirect:
+                    break
+                url = urljoin(url, response.headers.get("Location", ""))
+                response.close()
+                if not self.is_allowed(url):
+                    raise ImageFetchError(f"허용되지 않은 리다이렉트: {urlparse(url).hostname}")
+            else:
+                raise ImageFetchError("리다이렉트가 너무 많음")
+
+            response.raise_for_status()
+
+            data = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                data.extend(chunk)
+                if len(data) > MAX_SOURCE_BYTES:
+                    raise ImageFetchError("원본 이미지가 너무 큼")
+        except requests.RequestException as e:
+            raise ImageFetchError(f"원본 요청 실패: {e}")
+
+        if _sniff_mimetype(bytes(data[:12])) == "application/octet-stream":
+            raise ImageFetchError("이미지가 아님")
+
+        print(f"🖼️  원본 캐시: {url} ({len(data) / 1024:.0f}KB)")
+        return bytes(data)
+
+    def _resize(self, data: bytes, box: Tuple[int, int]) -> bytes:
+        """JPEG로 축소 (Pillow 없거나 디코딩 실패면 원본)"""
+
+        if Image is None:
+            return data
+
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                img = img.convert("RGB")
+                img.thumbnail(box, Image.LANCZOS)
+                out = io.BytesIO()
+                img.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                return out.getvalue()
+        except Exception as e:
+            print(f"⚠️  이미지 축소 실패, 원본 사용: {e}")
+            return data
+
+    def _touch(self, name: str) -> Optional[str]:
+        """있으면 최근 사용으로 표시 후 경로"""
+
+        with self._lock:
+            if name not in self._files:
+                return None
+            self._files.move_to_end(name)
+
+        # 파일 시각은 건드리지 않음 (ETag/Last-Modified가 매번 바뀌면 304를 못 줌)
+        path = os.path.join(self.cache_dir, name)
+        if not os.path.isfile(path):
+            # 밖에서 지워짐
+            with self._lock:
+                self._total -= self._files.pop(name, 0)
+            return None
+        return path
+
+    def _read(self, name: str) -> Optional[bytes]:
+        path = self._touch(name)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _head(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read(12)
+
+    def _write(self, name: str, data: bytes) -> str:
+        """임시 파일 → 교체 후 용량 넘으면 오래된 것부터 삭제"""
+
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            self._total += len(data) - self._files.pop(name, 0)
+            self._files[name] = len(data)
+
+            # 방금 쓴 파일은 남김
+            while self._total > self.max_bytes and len(self._files) > 1:
+                old, size = self._files.popitem(last=False)
+                self._total -= size
+                evicted.append(old)
+            self._stats["evictions"] += len(evicted)
+
+        for old in evicted:
+            try:
+                os.remove(os.path.join(self.cache_dir, old))
+            except OSError:
+                pass
+
+        return path
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "files": len(self._files),
+                "bytes": self._total,
+                "maxBytes": self.max_bytes,
+                "resize": Image is not None,
+            }
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+비동기 작업 큐 - 고정 개수 워커 스레드가 오래 걸리는 생성을 처리
+웹 스레드는 작업 id만 받고 바로 반환
+"""
+
+import queue
+import threading
+import time
+import traceback
+import uuid
+from typing import Callable, Dict, Optional
+
+
+class QueueFullError(Exception):
+    """대기열이 가득 참"""
+    pass
+
+
+class Job:
+    """작업 하나의 상태 (워커가 update로 진행 상황 기록)"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+        self.status = "queued"      # queued → running → done / failed
+        self.stage = None
+        self.partial = None
+        self.result = None
+        self.error = None
+
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, stage: str = None, partial=None):
+        """진행 단계/중간 결과 기록"""
+        with self._lock:
+            if stage is not None:
+                self.stage = stage
+            if partial is not None:
+                self.partial = partial
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            data = {
+                "jobId": self.id,
+                "status": self.status,
+                "stage": self.stage,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+            }
+            if self.partial is not None and self.status != "done":
+                data["partial"] = self.partial
+            if self.result is not None:
+                data["result"] = self.result
+            if self.error is not None:
+                data["error"] = self.error
+            return data
+
+
+class JobQueue:
+    """고정 크기 워커 풀 + 크기 제한 대기열"""
+
+    def __init__(self, worker_count: int = 4, max_pending: int = 100, ttl: float = 3600):
+        self.worker_count = worker_count
+        self.ttl = ttl
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started = time.time()
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+        for i in range(worker_count):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+
+        print(f"👷 작업 워커 {worker_count}개 시작 (대기열 최대 {max_pending})")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """작업 등록 - fn(job, *args, **kwargs)의 반환값이 최종 결과"""
+
+        self._cleanup()
+
+        job = Job(fn, args, kwargs)
+
+        # 워커가 바로 꺼내도 조회되도록 먼저 등록
+        with self._lock:
+            self._jobs[job.id] = job
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self._counts["rejected"] += 1
+            raise QueueFullError("대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+
+        with self._lock:
+            self._counts["submitted"] += 1
+
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+
+            started = time.time()
+            with job._lock:
+                job.status = "running"
+                job.started_at = started
+            with self._lock:
+                self._busy += 1
+                self._wait_total += started - job.created_at
+
+            try:
+                result = job.fn(job, *job.args, **job.kwargs)
+                with job._lock:
+                    job.result = result
+                    job.status = "done"
+                outcome = "completed"
+            except Exception as e:
+                print(f"❌ 작업 {job.id[:8]} 실패: {e}")
+                traceback.print_exc()
+                with job._lock:
+                    job.error = str(e)
+                    job.status = "failed"
+                outcome = "failed"
+            finally:
+                finished = time.time()
+                with job._lock:
+                    job.finished_at = finished
+                with self._lock:
+                    self._busy -= 1
+                    self._busy_seconds += finished - started
+                    self._run_total += finished - started
+                    self._counts[outcome] += 1
+                self._queue.task_done()
+
+    def _cleanup(self):
+        """끝난 지 오래된 작업 제거"""
+        now = time.time()
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at and now - job.finished_at > self.ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def stats(self) -> Dict:
+        """대기열 깊이, 워커 사용률, 처리 시간"""
+
+        with self._lock:
+            finished = self._counts["completed"] + self._counts["failed"]
+            started = finished + self._busy
+            uptime = max(time.time() - self._started, 1e-9)
+
+            return {
+                "queueDepth": self._queue.qsize(),
+                "maxPending": self._queue.maxsize,
+                "workers": self.worker_count,
+                "busyWorkers": self._busy,
+                "utilization": round(self._busy / self.worker_count, 3),
+                "avgUtilization": round(self._busy_seconds / (self.worker_count * uptime), 3),
+                "avgWaitMs": round(self._wait_total / started * 1000, 1) if started else None,
+                "avgRunMs": round(self._run_total / finished * 1000, 1) if finished else None,
+                "trackedJobs": len(self._jobs),
+                **self._counts,
+            }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+샘플링 프로파일러 - N번째 요청마다 cProfile 덤프
+cProfile은 스레드 단위라서, 샘플된 요청이 다른 스레드(티어/Gemini 실행기)에
+넘긴 작업도 wrap()으로 감싸 같은 세션에 합침
+(3.12부터는 cProfile이 sys.monitoring 기반이라 인터프리터 전체에 하나만 켤 수 있고,
+ 켜 두면 모든 스레드가 잡힘 → wrap()은 그대로 통과, 동시에 샘플되는 요청은 하나로 제한)
+꺼져 있으면 카운터 확인 한 번이 전부
+"""
+
+import contextvars
+import cProfile
+import glob
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+# aggregate_text()가 받는 정렬 기준 (pstats 이름)
+SORT_KEYS = tuple(pstats.Stats.sort_arg_dict_default)
+
+# 현재 요청의 프로파일 세션 (샘플되지 않았으면 None)
+_session = contextvars.ContextVar("profile_session", default=None)
+
+# 3.11까지는 프로파일러가 스레드 단위
+PER_THREAD = sys.version_info < (3, 12)
+
+# 3.12+: 프로세스 전체에서 동시에 켜진 프로파일러는 하나
+_active = threading.Lock()
+
+
+class _Session:
+    """요청 하나에서 나온 스레드별 프로파일 모음"""
+
+    def __init__(self):
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile):
+        with self._lock:
+            self.profiles.append(profile)
+
+
+def wrap(fn: Callable) -> Callable:
+    """다른 스레드로 넘길 함수 - 샘플된 요청 안이면 그 스레드에서도 프로파일"""
+
+    session = _session.get()
+    if session is None or not PER_THREAD:
+        return fn
+
+    def profiled(*args, **kwargs):
+        profile = cProfile.Profile()
+        token = _session.set(session)
+        try:
+            profile.enable()
+        except ValueError:
+            # 다른 프로파일링 도구(디버거 등)가 이미 켜져 있음 → 프로파일 없이 실행
+            _session.reset(token)
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            _session.reset(token)
+            session.add(profile)
+
+    return profiled
+
+
+class RequestProfiler:
+    """요청 샘플링 + 덤프 저장/집계"""
+
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, max_dumps: int = 200):
+        self.output_dir = output_dir
+        self.max_dumps = max_dumps
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._sampled = 0
+        self.set_rate(sample_rate)
+
+    def set_rate(self, sample_rate: float):
+        """0이면 끔, 0.001이면 1000번에 1번"""
+        with self._lock:
+            self.sample_rate = max(0.0, min(1.0, sample_rate))
+            self._every = round(1 / self.sample_rate) if self.sample_rate else 0
+            self.enabled = self._every > 0
+
+    def _should_sample(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._requests += 1
+            return self._requests % self._every == 0
+
+    @contextmanager
+    def profile(self, name: str):
+        """샘플되면 이 블록(+ wrap된 작업)을 프로파일해서 덤프"""
+
+        if not self._should_sample():
+            yield
+            return
+
+        # 3.12+: 다른 요청이 이미 프로파일 중이면 이번 샘플은 건너뜀
+        if not PER_THREAD and not _active.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            session = _Session()
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                print("⚠️  다른 프로파일링 도구가 켜져 있어 샘플 건너뜀")
+                yield
+                return
+
+            token = _session.set(session)
+            try:
+                yield
+            finally:
+                profile.disable()
+                _session.reset(token)
+                session.add(profile)
+                self._dump(name, session)
+        finally:
+            if not PER_THREAD:
+                _active.release()
+
+    def _dump(self, name: str, session: _Session):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        stats = pstats.Stats(session.profiles[0])
+        for profile in session.profiles[1:]:
+            stats.add(profile)
+
+        path = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{name}.prof")
+        stats.dump_stats(path)
+
+        with self._lock:
+            self._sampled += 1
+
+        # 오래된 덤프 정리
+        dumps = self._dumps()
+        for old in dumps[:-self.max_dumps]:
+            os.remove(old)
+
+        print(f"🔬 프로파일 저장: {os.path.basename(path)}")
+
+    def _dumps(self):
+        return sorted(glob.glob(os.path.join(self.output_dir, "*.prof")))
+
+    def aggregate(self) -> Optional[bytes]:
+        """모든 덤프를 합친 pstats 파일 내용 (없으면 None)"""
+
+        dumps = self._dumps()
+        if not dumps:
+            return None
+
+        stats = pstats.Stats(dumps[0])
+        for path in dumps[1:]:
+            stats.add(path)
+
+        with tempfile.NamedTemporaryFile(suffix=".prof", delete=False) as tmp:
+            tmp_path = tmp.name
+        try:
+            stats.dump_stats(tmp_path)
+            with open(tmp_path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(tmp_path)
+
+    def aggregate_text(self, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        """합친 결과를 사람이 읽는 표로 (sort는 SORT_KEYS 중 하나, 아니면 ValueError)"""
+
+        if sort not in SORT_KEYS:
+            raise ValueError(f"알 수 없는 정렬 기준: {sort}")
+
+        dumps = self._dumps()
+        if not dumps:
+            return None
+
+        out = io.StringIO()
+        stats = pstats.Stats(dumps[0], stream=out)
+        for path in dumps[1:]:
+            stats.add(path)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def reset(self):
+        for path in self._dumps():
+            os.remove(path)
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "sampleRate": self.sample_rate,
+                "requests": self._requests,
+                "sampled": self._sampled,
+                "dumps": len(self._dumps()),
+                "outputDir": self.output_dir,
+            }
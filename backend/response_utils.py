@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+응답 가공 - 필드 프로젝션 + gzip/brotli 압축
+"""
+
+import gzip
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 결과 리스트(displayRecommendationList)가 실제로 그리는 필드
+LIST_FIELDS = (
+    "id", "city", "region", "description",
+    "coverImage", "matchScore", "topTags"
+)
+
+# 클라이언트가 fields로 고를 수 있는 필드 (여행지 레코드 필드)
+PROJECTABLE_FIELDS = LIST_FIELDS + (
+    "centerLat", "centerLng", "scores", "quickInfo",
+    "spots", "restaurants", "tips", "avgRating"
+)
+
+# 이보다 작은 응답은 압축 안 함
+MIN_COMPRESS_SIZE = 500
+
+
+def get_top_tags(dest: Dict, limit: int = 4) -> List[str]:
+    """카테고리별 상위 2개 키워드 (프론트 getTopTags와 동일)"""
+
+    tags = []
+    for scores in dest.get("scores", {}).values():
+        if isinstance(scores, dict):
+            top = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:2]
+            tags.extend(key for key, _ in top)
+
+    return tags[:limit]
+
+
+def parse_fields(value) -> Tuple[str, ...]:
+    """요청의 fields → 허용 필드만 남긴 목록 (없으면 LIST_FIELDS, 문자열 리스트가 아니면 ValueError)"""
+
+    if value is None or value == []:
+        return LIST_FIELDS
+    if not isinstance(value, list) or not all(isinstance(f, str) for f in value):
+        raise ValueError("fields는 문자열 리스트여야 합니다")
+
+    fields = tuple(f for f in dict.fromkeys(value) if f in PROJECTABLE_FIELDS)
+    if not fields:
+        raise ValueError(f"허용된 필드가 없습니다 (가능: {', '.join(PROJECTABLE_FIELDS)})")
+    return fields
+
+
+def project(dest: Dict, fields: Iterable[str] = LIST_FIELDS) -> Dict:
+    """필요한 필드만 남긴 요약 레코드"""
+
+    summary = {}
+    for field in fields:
+        if field == "topTags":
+            summary["topTags"] = get_top_tags(dest)
+        elif field in dest:
+            summary[field] = dest[field]
+
+    return summary
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Accept-Encoding 파싱 (q값 포함)"""
+
+    result = {}
+    for part in header.split(","):
+        part = part.strip()
+        if not part:
+            continue
+
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+
+        result[name.strip().lower()] = q
+
+    return result
+
+
+def compress_response(response, accept_encoding: str):
+    """클라이언트가 지원하면 JSON 응답을 br/gzip으로 압축"""
+
+    if response.direct_passthrough or response.mimetype != "application/json":
+        return response
+    if response.status_code < 200 or response.status_code >= 300:
+        return response
+    if "Content-Encoding" in response.headers:
+        return response
+
+    response.vary.add("Accept-Encoding")
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    accepted = _accepted_encodings(accept_encoding or "")
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        encoding = "br"
+        compressed = brotli.compress(body, quality=5)
+    elif accepted.get("gzip", 0) > 0:
+        encoding = "gzip"
+        compressed = gzip.compress(body, compresslevel=6)
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    return response
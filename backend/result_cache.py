@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+추천 결과 캐시
+- 정확 일치: (지역, 키워드, 개수)
+- 유사 프로필: 같은 지역에서 키워드 프로필이 충분히 가까운 결과
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# 유사도 가중치는 매칭률 가중치를 그대로 사용
+from scoring import MATCH_WEIGHTS, MULTI_CHOICE
+
+
+def make_key(region: str, keywords: Dict, count: int) -> str:
+    """키워드 순서와 무관한 캐시 키"""
+
+    normalized = {}
+    for category, value in keywords.items():
+        if isinstance(value, list):
+            normalized[category] = sorted(value)
+        elif value:
+            normalized[category] = value
+
+    return json.dumps([region, normalized, count], ensure_ascii=False, sort_keys=True)
+
+
+def profile_similarity(a: Dict, b: Dict) -> float:
+    """키워드 프로필 유사도 0-1 (다중 선택은 Jaccard, 단일 선택은 일치 여부)"""
+
+    total = 0.0
+    for category, weight in MATCH_WEIGHTS.items():
+        if category in MULTI_CHOICE:
+            set_a, set_b = set(a.get(category) or []), set(b.get(category) or [])
+            union = set_a | set_b
+            s = len(set_a & set_b) / len(union) if union else 1.0
+        else:
+            s = 1.0 if (a.get(category) or None) == (b.get(category) or None) else 0.0
+        total += weight * s
+
+    return total / sum(MATCH_WEIGHTS.values())
+
+
+class ResultCache:
+    """TTL + LRU 결과 캐시"""
+
+    def __init__(self, max_size: int = 500, ttl: float = 6 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, region: str, keywords: Dict, count: int) -> Optional[List[Dict]]:
+        """정확히 같은 요청의 결과 (복사본)"""
+
+        key = make_key(region, keywords, count)
+
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or time.time() - entry["time"] > self.ttl:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["destinations"])
+
+    def find_similar(self, region: str, keywords: Dict, count: int) -> Tuple[Optional[List[Dict]], float]:
+        """같은 지역/개수에서 가장 비슷한 프로필의 결과 (복사본, 유사도)"""
+
+        best, best_score = None, 0.0
+        now = time.time()
+
+        with self._lock:
+            for entry in self._items.values():
+                # 근사 결과를 다시 근사하면 점점 멀어지므로 제외
+                if entry["approximate"] or entry["region"] != region or entry["count"] != count:
+                    continue
+                if now - entry["time"] > self.ttl:
+                    continue
+
+                score = profile_similarity(keywords, entry["keywords"])
+                if score > best_score:
+                    best, best_score = entry, score
+
+            if best is None:
+                return None, 0.0
+            return copy.deepcopy(best["destinations"]), best_score
+
+    def put(self, region: str, keywords: Dict, count: int, destinations: List[Dict], approximate: bool = False):
+        """결과 저장 (호출자가 이후 수정해도 영향 없도록 복사)"""
+
+        key = make_key(region, keywords, count)
+
+        with self._lock:
+            self._items[key] = {
+                "time": time.time(),
+                "region": region,
+                "count": count,
+                "approximate": approximate,
+                "keywords": copy.deepcopy(keywords),
+                "destinations": copy.deepcopy(destinations),
+            }
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+매칭률 계산 - 키워드별 점수 가중합
+"""
+
+from typing import Dict, List, Tuple
+
+
+# 카테고리별 가중치 (다중 선택은 선택지 평균에 적용)
+MATCH_WEIGHTS = {
+    "여행_스타일": 0.2,
+    "동행": 0.15,
+    "테마": 0.4,
+    "페이스": 0.1,
+    "교통": 0.1,
+    "분위기": 0.05,
+}
+MULTI_CHOICE = ("테마", "분위기")
+
+
+def match_score_plan(keywords: Dict) -> List[Tuple[str, List[str], float]]:
+    """키워드 → (카테고리, 선택지들, 가중치) 목록 - 여행지마다 선택지 점수 평균 × 가중치를 더함"""
+
+    plan = []
+    for category, weight in MATCH_WEIGHTS.items():
+        value = keywords.get(category)
+        if not value:
+            continue
+        options = list(value) if category in MULTI_CHOICE else [value]
+        plan.append((category, options, weight))
+
+    return plan
+
+
+def compute_match_score(dest: Dict, keywords: Dict) -> int:
+    """여행지 하나의 매칭률 (72-98)"""
+
+    scores_by_category = dest.get("scores", {})
+    score = 55
+
+    for category, options, weight in match_score_plan(keywords):
+        values = [scores_by_category.get(category, {}).get(option, 0) for option in options]
+        score += (sum(values) / len(values)) * weight
+
+    return min(98, max(72, int(score)))
+
+
+def rank_destinations(destinations: List[Dict], keywords: Dict) -> List[Dict]:
+    """matchScore 기록 후 내림차순 정렬"""
+
+    for dest in destinations:
+        dest['matchScore'] = compute_match_score(dest, keywords)
+
+    destinations.sort(key=lambda x: x.get('matchScore', 0), reverse=True)
+    return destinations
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+이미지 프록시 테스트 - 127.0.0.1에 띄운 로컬 원본 서버 사용
+"""
+
+import http.server
+import io
+import os
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import image_proxy
+from image_proxy import ImageCache, ImageFetchError
+
+
+# 고정 크기 가짜 JPEG (매직 바이트 + 채움)
+BLOB = b"\xff\xd8\xff\xe0" + b"\x00" * 996
+
+
+def _jpeg(width, height):
+    from PIL import Image
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(out, "JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def origin():
+    """/blob/<n>: BLOB, /photo: 800x600 JPEG, /bounce: 허용 안 된 호스트로 리다이렉트"""
+
+    hits = Counter()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] += 1
+            if self.path == "/bounce":
+                self.send_response(302)
+                self.send_header("Location", f"http://localhost:{self.server.server_port}/blob/internal")
+                self.end_headers()
+                return
+
+            body = _jpeg(800, 600) if self.path == "/photo" else BLOB
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_pillow(monkeypatch):
+    monkeypatch.setattr(image_proxy, "Image", None)
+
+
+def test_fetches_each_url_once(tmp_path, origin, no_pillow):
+    base, hits = origin
+    cache = ImageCache(str(tmp_path), ["127.0.0.1"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(lambda _: cache.get(f"{base}/blob/1", "thumb")[0], range(8)))
+    cache.get(f"{base}/blob/1", "detail")
+
+    assert hits["/blob/1"] == 1
+    assert len(set(paths)) == 1
+
+
+def test_lru_eviction_at_max_bytes(tmp_path, origin, no_pillow):
+    base, hits = origin
+    cache = ImageCache(str(tmp_path), ["127.0.0.1"], max_bytes=2 * len(BLOB))
+
+    cache.get(f"{base}/blob/1", "orig")
+    cache.get(f"{base}/blob/2", "orig")
+    cache.get(f"{base}/blob/1", "orig")     # 1이 최근 사용 → 2가 가장 오래됨
+    cache.get(f"{base}/blob/3", "orig")
+
+    stats = cache.stats()
+    assert stats["files"] == 2
+    assert stats["bytes"] <= 2 * len(BLOB)
+    assert stats["evictions"] == 1
+    assert len(os.listdir(tmp_path)) == 2
+
+    cache.get(f"{base}/blob/1", "orig")
+    cache.get(f"{base}/blob/2", "orig")
+    assert hits["/blob/1"] == 1
+    assert hits["/blob/2"] == 2
+
+
+def test_variants_are_resized(tmp_path, origin):
+    Image = pytest.importorskip("PIL.Image")
+    base, hits = origin
+    cache = ImageCache(str(tmp_path), ["127.0.0.1"])
+
+    sizes = {}
+    for size in ("thumb", "detail", "orig"):
+        path, mimetype = cache.get(f"{base}/photo", size)
+        assert mimetype == "image/jpeg"
+        with Image.open(path) as img:
+            sizes[size] = img.size
+
+    assert sizes["thumb"] == image_proxy.VARIANTS["thumb"]
+    assert sizes["detail"] == (800, 600)     # 원본보다 크게 만들지 않음
+    assert sizes["orig"] == (800, 600)
+    assert hits["/photo"] == 1
+
+
+def test_variants_fall_back_to_original_without_pillow(tmp_path, origin, no_pillow):
+    base, _ = origin
+    cache = ImageCache(str(tmp_path), ["127.0.0.1"])
+
+    thumb, _ = cache.get(f"{base}/blob/1", "thumb")
+    detail, _ = cache.get(f"{base}/blob/1", "detail")
+
+    assert thumb == detail
+    with open(thumb, "rb") as f:
+        assert f.read() == BLOB
+
+
+def test_rejects_other_hosts_and_redirects(tmp_path, origin):
+    base, hits = origin
+    cache = ImageCache(str(tmp_path), ["127.0.0.1"])
+
+    with pytest.raises(ImageFetchError):
+        cache.get(base.replace("127.0.0.1", "localhost") + "/blob/1", "thumb")
+    with pytest.raises(ImageFetchError):
+        cache.get(f"{base}/bounce", "thumb")
+
+    assert hits["/blob/internal"] == 0
+    assert cache.proxy_url("https://example.com/a.jpg", "thumb") == "https://example.com/a.jpg"
@@ -11,7 +11,10 @@ const state = {
         교통: null,
         분위기: []
     },
-    recommendations: []
+    recommendations: [],
+    details: {},
+    resultHandle: null,     // 마지막 결과 묶음 (키워드만 바꾸면 재정렬)
+    resultRegion: null
 };
 
 // 초기화
@@ -239,22 +242,38 @@ async function submitKeywords() {
     document.getElementById('loading').classList.remove('hidden');
     
     try {
-        // API 호출 - 키워드와 지역 정보 함께 전송
-        const response = await fetch('/api/recommendations', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                keywords: state.keywords,
-                region: state.selectedRegion
-            })
-        });
+        let result = null;
         
-        const result = await response.json();
+        // 같은 지역에서 키워드만 바꿨으면 기존 결과 재정렬 (생성 없음)
+        if (state.resultHandle && state.resultRegion === state.selectedRegion) {
+            result = await rerankResults();
+        }
+        
+        if (!result) {
+            // API 호출 - 작업으로 등록하고 완료될 때까지 상태 조회
+            const response = await fetch('/api/recommendations', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    keywords: state.keywords,
+                    region: state.selectedRegion,
+                    async: true
+                })
+            });
+            
+            result = await response.json();
+            
+            if (result.success && result.jobId) {
+                result = await waitForJob(result.jobId);
+            }
+        }
         
         if (result.success) {
             state.recommendations = result.data;
+            state.resultHandle = result.handle || null;
+            state.resultRegion = state.selectedRegion;
             displayResults();
         } else {
             alert('추천 결과를 가져오는데 실패했습니다: ' + result.error);
@@ -267,6 +286,57 @@ async function submitKeywords() {
     }
 }
 
+// 기존 결과 재정렬 (묶음이 만료됐으면 null → 새로 생성)
+async function rerankResults() {
+    try {
+        const response = await fetch(`/api/recommendations/${state.resultHandle}/rerank`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                keywords: state.keywords,
+                region: state.selectedRegion
+            })
+        });
+        
+        if (!response.ok) {
+            return null;
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('재정렬 오류:', error);
+        return null;
+    }
+}
+
+// 작업 상태 조회 간격 / 최대 대기 (Gemini 티어 예산 5분 + 여유)
+const JOB_POLL_INTERVAL_MS = 1500;
+const JOB_MAX_WAIT_MS = 6 * 60 * 1000;
+
+// 작업 완료까지 상태 조회
+async function waitForJob(jobId) {
+    const deadline = Date.now() + JOB_MAX_WAIT_MS;
+    
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const job = await response.json();
+        
+        if (job.status === 'done') {
+            return job.result;
+        }
+        if (job.status === 'failed' || response.status === 404) {
+            return { success: false, error: job.error };
+        }
+        
+        console.log('작업 진행:', job.status, job.stage || '');
+    }
+    
+    return { success: false, error: '응답 시간이 너무 오래 걸립니다. 잠시 후 다시 시도해주세요.' };
+}
+
 // 결과 표시
 function displayResults() {
     // 화면 전환
@@ -316,7 +386,7 @@ function displayRecommendationList() {
     }
     
     container.innerHTML = state.recommendations.map(dest => `
-        <div class="result-card" onclick="showDetail(${dest.id})">
+        <div class="result-card" onclick="showDetail('${dest.id}')">
             <img src="${dest.coverImage}" alt="${dest.city}" class="result-image" onerror="this.src='https://via.placeholder.com/400x300?text=${dest.city}'">
             <div class="result-content">
                 <div class="result-header">
@@ -337,6 +407,11 @@ function displayRecommendationList() {
 
 // 상위 태그 가져오기
 function getTopTags(destination) {
+    // 목록 응답은 서버에서 계산한 태그만 내려옴
+    if (destination.topTags) {
+        return destination.topTags;
+    }
+    
     const tags = [];
     
     // 점수가 높은 카테고리 추출
@@ -352,10 +427,36 @@ function getTopTags(destination) {
     return tags.slice(0, 4);
 }
 
+// 상세 정보 가져오기 (서버 캐시, 한 번 받으면 재사용)
+async function fetchDetail(destId) {
+    if (state.details[destId]) {
+        return state.details[destId];
+    }
+    
+    try {
+        const response = await fetch(`/api/destinations/${destId}`);
+        const result = await response.json();
+        
+        if (result.success) {
+            state.details[destId] = result.data;
+            return result.data;
+        }
+    } catch (error) {
+        console.error('상세 조회 오류:', error);
+    }
+    
+    // 목록에 전체 정보가 있으면 그대로 사용
+    const summary = state.recommendations.find(d => d.id === destId);
+    return summary && summary.spots ? summary : null;
+}
+
 // 상세 정보 표시 (지도 없는 버전)
 async function showDetail(destId) {
-    const destination = state.recommendations.find(d => d.id === destId);
-    if (!destination) return;
+    const destination = await fetchDetail(destId);
+    if (!destination) {
+        alert('여행지 정보를 불러오지 못했습니다. 다시 검색해주세요.');
+        return;
+    }
     
     const modal = document.getElementById('detail-modal');
     const body = document.getElementById('modal-body');
@@ -493,6 +594,9 @@ function resetAll() {
         분위기: []
     };
     state.recommendations = [];
+    state.details = {};
+    state.resultHandle = null;
+    state.resultRegion = null;
     
     document.querySelectorAll('.option-card.selected').forEach(card => {
         card.classList.remove('selected');